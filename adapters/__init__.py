@@ -5,12 +5,19 @@ from .base import IBackendAdapter, QueryResult, QueryPattern, ConnectorInfo
 from .rest_sse import RestSSEAdapter
 from .arrow_flight import ArrowFlightAdapter
 
+# Adapter asyncio opcional (requiere aiohttp)
+try:
+    from .rest_sse_async import AsyncRestSSEAdapter
+except ImportError:
+    AsyncRestSSEAdapter = None
+
 __all__ = [
     "IBackendAdapter",
     "QueryResult",
     "QueryPattern",
     "ConnectorInfo",
     "RestSSEAdapter",
-    "ArrowFlightAdapter"
+    "ArrowFlightAdapter",
+    "AsyncRestSSEAdapter"
 ]
 
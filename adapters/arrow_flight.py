@@ -1,13 +1,20 @@
 """
-Arrow Flight Adapter for Systems 2 & 3.
+Arrow Flight Adapter for Systems 2, 3 & 4.
 System 2: enrutador-gateway (Python)
 System 3: enrutador-gateway-node (Node.js)
-Both expose Arrow Flight gRPC interface.
+System 4: enrutador-gateway-go (Go)
+All expose Arrow Flight gRPC interface and share the native pyarrow client.
 """
+import os
 import time
+import functools
+import itertools
 import logging
+import threading
 import requests
-from typing import List, Optional, Generator
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Generator, Tuple, Union
 
 import pyarrow as pa
 import pyarrow.flight as flight
@@ -16,40 +23,166 @@ from .base import (
     IBackendAdapter, 
     QueryResult, 
     QueryPattern, 
-    ConnectorInfo
+    ConnectorInfo,
+    next_request_id
 )
 
 logger = logging.getLogger(__name__)
 
 
+def _select_memory_pool() -> pa.MemoryPool:
+    """jemalloc si el build de pyarrow lo incluye (evita fragmentación en procesos largos)."""
+    try:
+        return pa.jemalloc_memory_pool()
+    except NotImplementedError:
+        return pa.default_memory_pool()
+
+
+# Pool de memoria Arrow del proceso (DoGet, serialización IPC)
+pa.set_memory_pool(_select_memory_pool())
+
+# Marcador de fin de stream IPC (continuation token + longitud 0)
+_IPC_EOS = pa.py_buffer(b"\xff\xff\xff\xff\x00\x00\x00\x00")
+
+# Tamaño objetivo de los batches entregados en streaming: 8192 filas de
+# 4 columnas int64 (~256 KB) caben en L2 y amortizan el overhead por batch.
+DEFAULT_TARGET_BATCH_BYTES = 256 * 1024
+
+# Opciones gRPC del canal Flight:
+# - los DoGet grandes superan el límite de 4 MB por defecto
+# - frames HTTP/2 grandes + BDP probe para que la ventana de flow control crezca
+# - keepalive para no perder el canal entre fases del benchmark: los servidores
+#   gRPC (C-core de pyarrow y grpc-go) por defecto toleran pings sin datos cada
+#   >= 5 min y cortan con GOAWAY too_many_pings tras 2 strikes; 5.5 min deja
+#   margen para jitter de red
+# - subchannel pool local: cada FlightClient del pool abre su propia conexión
+#   TCP (con el pool global, canales con los mismos args la compartirían)
+_GRPC_OPTIONS = [
+    ("grpc.max_receive_message_length", 200 * 1024 * 1024),
+    ("grpc.http2.max_frame_size", 16777215),
+    ("grpc.http2.bdp_probe", 1),
+    ("grpc.keepalive_time_ms", 330000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.max_concurrent_streams", 64),
+    ("grpc.use_local_subchannel_pool", 1),
+]
+
+
+def _concat_batches(batches: List[pa.RecordBatch]) -> pa.RecordBatch:
+    """Une batches con el mismo schema en un solo RecordBatch contiguo."""
+    if len(batches) == 1:
+        return batches[0]
+    return pa.Table.from_batches(batches).combine_chunks().to_batches()[0]
+
+
+@functools.lru_cache(maxsize=2048)
+def _make_descriptor(
+    connector_id: str,
+    dataset: str,
+    rows: Optional[int] = None
+) -> flight.FlightDescriptor:
+    """FlightDescriptor de path (tenant, dataset[, rows]), cacheado por argumentos."""
+    path_args = [connector_id.encode(), dataset.encode()]
+    if rows:
+        path_args.append(str(rows).encode())
+    return flight.FlightDescriptor.for_path(*path_args)
+
+
+def _has_dictionary(data_type: pa.DataType) -> bool:
+    """True si el tipo (o algún hijo: struct, list, map...) es dictionary-encoded."""
+    if pa.types.is_dictionary(data_type):
+        return True
+    return any(
+        _has_dictionary(data_type.field(i).type)
+        for i in range(data_type.num_fields)
+    )
+
+
+class _DrainSink:
+    """
+    Destino de un RecordBatchStreamWriter que guarda los bytes escritos hasta
+    drain(): permite emitir el stream IPC mensaje a mensaje con el writer real
+    (incluye los dictionary batches que RecordBatch.serialize() no escribe).
+    """
+    
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.closed = False
+    
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def drain(self) -> pa.Buffer:
+        data = b"".join(self._parts)
+        self._parts = []
+        return pa.py_buffer(data)
+
+
+# os.writev no existe en Windows: resolver una vez, fuera del path de escritura
+_HAS_WRITEV = hasattr(os, "writev")
+
+
+def _write_through(fd: int, buf: pa.Buffer) -> None:
+    """Escribe el buffer Arrow directo al fd, sin copiarlo a bytes ni al buffer de io."""
+    view = memoryview(buf)
+    while view:
+        if _HAS_WRITEV:
+            written = os.writev(fd, [view])
+        else:  # Windows
+            written = os.write(fd, view)
+        view = view[written:]
+
+
 class ArrowFlightAdapter(IBackendAdapter):
     """
     Adaptador para enrutador-gateway y enrutador-gateway-node.
     Protocolo: Arrow Flight (gRPC)
     """
     
-    # Cache for compiled proto stubs (shared across all instances for system3)
-    _proto_stubs = None
-    _grpc_channel = None
-    _stubs_compiled = False
+    # Pool de clientes por URI compartido por todas las instancias del proceso.
+    # FlightClient es thread-safe y multiplexa los DoGet sobre un canal HTTP/2;
+    # con pool_size > 1 las llamadas se reparten round-robin entre N canales.
+    _client_pool: Dict[str, List[flight.FlightClient]] = {}
+    _client_lock = threading.Lock()
+    
+    # Último resultado de health_check por (health_url, flight_uri): (monotonic, healthy)
+    _health_cache: Dict[Tuple[str, str], Tuple[float, bool]] = {}
+    _HEALTH_TTL = 1.0
+    
+    # Sesión HTTP compartida para el health check (keep-alive entre llamadas)
+    _http_session = requests.Session()
+    _http_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    _http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
     
     def __init__(
         self,
         flight_uri: str = "grpc://localhost:8815",
         health_url: str = "http://localhost:8080/health",
         timeout: int = 60,
-        backend_name: str = "system2"
+        backend_name: str = "system2",
+        call_headers: Optional[Dict[str, str]] = None,
+        pool_size: int = 1
     ):
         self._flight_uri = flight_uri
         self._health_url = health_url
         self._timeout = timeout
         self._backend_name = backend_name
-        self._client: Optional[flight.FlightClient] = None
+        self._pool_size = max(1, pool_size)
+        self._clients: Optional[List[flight.FlightClient]] = None
+        self._next_client = itertools.count()
         
-        # Reset gRPC channel if backend uses raw gRPC (system3/system4)
-        # Each backend may connect to different hosts
-        if backend_name in ("system3", "system4"):
-            ArrowFlightAdapter._grpc_channel = None
+        # Headers gRPC extra por llamada (para gateways con diferencias de protocolo)
+        self._call_headers = [
+            (k.encode(), v.encode()) for k, v in (call_headers or {}).items()
+        ]
     
     @property
     def name(self) -> str:
@@ -60,28 +193,66 @@ class ArrowFlightAdapter(IBackendAdapter):
         return [QueryPattern.SYNC, QueryPattern.STREAM]
     
     def _get_client(self) -> flight.FlightClient:
-        """Lazy initialization del cliente Flight."""
-        if self._client is None:
-            self._client = flight.FlightClient(self._flight_uri)
-        return self._client
+        """Obtiene un cliente Flight del pool del proceso (round-robin si pool_size > 1)."""
+        clients = self._clients
+        if clients is None:
+            clients = self._clients = self._pooled_clients()
+        if len(clients) == 1:
+            return clients[0]
+        # next() sobre itertools.count es atómico bajo el GIL: sin lock por llamada
+        return clients[next(self._next_client) % len(clients)]
+    
+    def _pooled_clients(self) -> List[flight.FlightClient]:
+        """Primeros pool_size clientes del URI, creando los que falten (una vez por proceso)."""
+        with ArrowFlightAdapter._client_lock:
+            clients = ArrowFlightAdapter._client_pool.setdefault(self._flight_uri, [])
+            while len(clients) < self._pool_size:
+                clients.append(flight.FlightClient(
+                    self._flight_uri,
+                    generic_options=_GRPC_OPTIONS
+                ))
+            return clients[:self._pool_size]
+    
+    def _call_options(self, timeout: Optional[float] = None) -> flight.FlightCallOptions:
+        """Opciones por llamada: timeout y headers específicos del backend."""
+        return flight.FlightCallOptions(
+            timeout=timeout,
+            headers=self._call_headers or None
+        )
     
     def health_check(self) -> bool:
-        """Verifica conectividad con el Gateway."""
+        """Verifica conectividad con el Gateway (resultado cacheado _HEALTH_TTL segundos)."""
+        key = (self._health_url, self._flight_uri)
+        cached = ArrowFlightAdapter._health_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < ArrowFlightAdapter._HEALTH_TTL:
+            return cached[1]
+        
+        healthy = self._probe_health()
+        ArrowFlightAdapter._health_cache[key] = (now, healthy)
+        return healthy
+    
+    def _probe_health(self) -> bool:
+        """HTTP health check y, si falla, un list_actions con timeout corto sobre Flight."""
         try:
             # Intentar HTTP health check primero
-            response = requests.get(self._health_url, timeout=5)
+            response = self._http_session.get(self._health_url, timeout=5)
             if response.status_code == 200:
                 return True
         except:
             pass
         
-        # Fallback: intentar list_flights
+        # Fallback: un único RPC barato (list_actions) en vez de list_flights,
+        # que enumera el catálogo; sin reintentos, falla en <= 2s si no hay servidor
         try:
             client = self._get_client()
-            list(client.list_flights())
+            client.list_actions(self._call_options(timeout=2))
+            return True
+        except pa.ArrowNotImplementedError:
+            # El servidor respondió aunque no implemente ListActions
             return True
         except Exception as e:
-            logger.error(f"Health check failed: {e}")
+            logger.error("Health check failed: %s", e)
             return False
     
     def list_connectors(self) -> List[ConnectorInfo]:
@@ -102,7 +273,7 @@ class ArrowFlightAdapter(IBackendAdapter):
                         }
                     ))
         except Exception as e:
-            logger.error(f"Error listing connectors: {e}")
+            logger.error("Error listing connectors: %s", e)
         
         return connectors
     
@@ -117,347 +288,163 @@ class ArrowFlightAdapter(IBackendAdapter):
         """
         Arrow Flight: GetFlightInfo + DoGet.
         Lee todos los datos de forma síncrona.
-        
-        Para system3 (Node.js), usa método alternativo por incompatibilidad de protocolo.
         """
-        # System3 and System4 use alternative implementation (raw gRPC)
-        if self._backend_name in ("system3", "system4"):
-            return self._query_sync_raw(connector_id, dataset, timeout, rows)
-        
         t0 = time.perf_counter()
         
-        result = QueryResult(
-            request_id=f"{connector_id}:{dataset}:{t0}",
-            backend=self._backend_name,
-            connector_id=connector_id,
-            dataset=dataset,
-            pattern=QueryPattern.SYNC.value,
-            status="pending",
-            t0_sent=t0
-        )
+        # Estado en locales; el QueryResult se construye una vez al final
+        status = "pending"
+        error = None
+        num_rows = 0
+        num_bytes = 0
+        ttfb = 0.0
+        metadata_latency = 0.0
+        transfer_latency = 0.0
         
         try:
             client = self._get_client()
             
             # 1. GetFlightInfo
-            t_meta_start = time.perf_counter()
-            
-            path_args = [connector_id.encode(), dataset.encode()]
-            if rows:
-                path_args.append(str(rows).encode())
-            
-            descriptor = flight.FlightDescriptor.for_path(*path_args)
-            info = client.get_flight_info(descriptor)
+            descriptor = _make_descriptor(connector_id, dataset, rows)
+            options = self._call_options(timeout)
+            info = client.get_flight_info(descriptor, options)
             
-            t_meta_end = time.perf_counter()
-            result.metadata_latency = t_meta_end - t_meta_start
+            # Solo 4 timestamps por query: t0, t_meta, t_transfer y el total
+            t_meta = time.perf_counter()
+            metadata_latency = t_meta - t0
             
             if not info.endpoints:
-                result.status = "error"
-                result.error = "No endpoints returned from GetFlightInfo"
-                result.total_time = time.perf_counter() - t0
-                return result
-            
-            # 2. DoGet
-            t_transfer_start = time.perf_counter()
-            
-            endpoint = info.endpoints[0]
-            reader = client.do_get(endpoint.ticket)
-            
-            # Leer todos los datos
-            table = reader.read_all()
-            
-            t_transfer_end = time.perf_counter()
-            result.transfer_latency = t_transfer_end - t_transfer_start
-            result.ttfb = t_meta_end - t0  # TTFB = tiempo hasta metadata
-            
-            # Métricas de datos
-            result.rows = table.num_rows
-            result.bytes = table.nbytes
-            result.status = "success"
+                status = "error"
+                error = "No endpoints returned from GetFlightInfo"
+            else:
+                # 2. DoGet
+                endpoint = info.endpoints[0]
+                reader = client.do_get(endpoint.ticket, options)
+                
+                # Leer todos los datos
+                table = reader.read_all()
+                
+                transfer_latency = time.perf_counter() - t_meta
+                ttfb = metadata_latency  # TTFB = tiempo hasta metadata
+                
+                # Métricas de datos
+                num_rows = table.num_rows
+                num_bytes = table.nbytes
+                status = "success"
             
         except flight.FlightError as e:
-            result.status = "error"
-            result.error = f"Flight error: {e}"
+            status = "error"
+            error = f"Flight error: {e}"
             
         except Exception as e:
-            result.status = "error"
-            result.error = str(e)
-        
-        result.total_time = time.perf_counter() - t0
-        result.calculate_metrics()
-        return result
-    
-    def _query_sync_raw(
-        self, 
-        connector_id: str, 
-        dataset: str, 
-        timeout: int = 60,
-        rows: Optional[int] = None
-    ) -> QueryResult:
-        """
-        Método alternativo para system3 (Node.js).
-        Usa gRPC directo (como cli-client-node) y parsea IPC chunks con pyarrow.
+            status = "error"
+            error = str(e)
         
-        OPTIMIZADO: Cachea los stubs y reutiliza el canal gRPC.
-        """
-        import grpc
-        from pathlib import Path
-        
-        t0 = time.perf_counter()
+        total_time = time.perf_counter() - t0
         
-        result = QueryResult(
-            request_id=f"{connector_id}:{dataset}:{t0}",
+        return QueryResult(
+            request_id=next_request_id(),
             backend=self._backend_name,
             connector_id=connector_id,
             dataset=dataset,
             pattern=QueryPattern.SYNC.value,
-            status="pending",
-            t0_sent=t0
+            status=status,
+            rows=num_rows,
+            bytes=num_bytes,
+            t0_sent=t0,
+            ttfb=ttfb,
+            total_time=total_time,
+            metadata_latency=metadata_latency,
+            transfer_latency=transfer_latency,
+            error=error
         )
-        
-        try:
-            # Inicializar stubs una sola vez (thread-safe con caching a nivel de clase)
-            if not ArrowFlightAdapter._stubs_compiled:
-                self._compile_proto_stubs()
-            
-            # Obtener stubs desde cache
-            flight_pb2 = ArrowFlightAdapter._proto_stubs['pb2']
-            flight_pb2_grpc = ArrowFlightAdapter._proto_stubs['pb2_grpc']
-            
-            # Reutilizar o crear canal gRPC
-            uri = self._flight_uri.replace("grpc://", "")
-            if ArrowFlightAdapter._grpc_channel is None:
-                ArrowFlightAdapter._grpc_channel = grpc.insecure_channel(uri, options=[
-                    ('grpc.max_receive_message_length', 200 * 1024 * 1024),
-                ])
-            
-            stub = flight_pb2_grpc.FlightServiceStub(ArrowFlightAdapter._grpc_channel)
-            
-            # 1. GetFlightInfo
-            path = [connector_id.encode(), dataset.encode()]
-            if rows:
-                path.append(str(rows).encode())
-            
-            descriptor = flight_pb2.FlightDescriptor(
-                type=flight_pb2.FlightDescriptor.PATH,
-                path=path
-            )
-            
-            info = stub.GetFlightInfo(descriptor, timeout=timeout)
-            result.ttfb = time.perf_counter() - t0
-            
-            if not info.endpoint:
-                result.status = "error"
-                result.error = "No endpoints returned"
-                result.total_time = time.perf_counter() - t0
-                return result
-            
-            # 2. DoGet - recibir chunks y parsear como IPC
-            ticket = info.endpoint[0].ticket
-            
-            chunks = []
-            for flight_data in stub.DoGet(flight_pb2.Ticket(ticket=ticket.ticket), timeout=timeout):
-                if flight_data.data_body and len(flight_data.data_body) > 0:
-                    chunks.append(flight_data.data_body)
-            
-            # Parsear chunks IPC
-            if not chunks:
-                result.status = "error"
-                result.error = "No data received"
-                result.total_time = time.perf_counter() - t0
-                return result
-            
-            total_rows = 0
-            total_bytes = 0
-            
-            for chunk in chunks:
-                buffer = pa.py_buffer(chunk)
-                reader = pa.ipc.open_stream(buffer)
-                table = reader.read_all()
-                total_rows += table.num_rows
-                total_bytes += len(chunk)
-            
-            result.rows = total_rows
-            result.bytes = total_bytes
-            result.status = "success"
-                
-        except Exception as e:
-            result.status = "error"
-            result.error = str(e)
-            logger.error(f"System3 query error: {e}")
-        
-        result.total_time = time.perf_counter() - t0
-        result.calculate_metrics()
-        return result
     
-    def _compile_proto_stubs(self):
-        """Compila los stubs de proto una sola vez y los cachea."""
-        import sys
-        import tempfile
-        import os
-        from pathlib import Path
-        from grpc_tools import protoc
-        
-        # Encontrar el proto de Flight
-        proto_paths = [
-            Path(__file__).parent.parent.parent / "enrutador-gateway-node" / "proto" / "Flight.proto",
-            Path(__file__).parent.parent / "proto" / "Flight.proto",
-        ]
-        
-        proto_path = None
-        for p in proto_paths:
-            if p.exists():
-                proto_path = p
-                break
-        
-        if not proto_path:
-            raise FileNotFoundError("Flight.proto not found. System3 requires the proto file.")
-        
-        proto_dir = proto_path.parent
-        
-        # Crear directorio persistente para los stubs
-        stubs_dir = Path(__file__).parent / ".grpc_stubs"
-        stubs_dir.mkdir(exist_ok=True)
-        
-        # Compilar proto solo si no existe
-        pb2_file = stubs_dir / "Flight_pb2.py"
-        if not pb2_file.exists():
-            protoc.main([
-                'grpc_tools.protoc',
-                f'-I{proto_dir}',
-                f'--python_out={stubs_dir}',
-                f'--grpc_python_out={stubs_dir}',
-                str(proto_path)
-            ])
-        
-        # Importar los módulos generados
-        if str(stubs_dir) not in sys.path:
-            sys.path.insert(0, str(stubs_dir))
-        
-        import Flight_pb2 as flight_pb2
-        import Flight_pb2_grpc as flight_pb2_grpc
-        
-        # Cachear
-        ArrowFlightAdapter._proto_stubs = {
-            'pb2': flight_pb2,
-            'pb2_grpc': flight_pb2_grpc
-        }
-        ArrowFlightAdapter._stubs_compiled = True
-        logger.info("Proto stubs compiled and cached for system3")
-    
-    def _query_stream_raw(
-        self, 
-        connector_id: str, 
-        dataset: str,
-        output_file: Optional[str] = None,
-        rows: Optional[int] = None
-    ) -> Generator[bytes, None, QueryResult]:
+    def query_sync_many(
+        self,
+        connector_id: str,
+        datasets: List[str],
+        timeout: int = 60,
+        rows: Optional[int] = None,
+        max_workers: int = 8
+    ) -> List[QueryResult]:
         """
-        Método alternativo de streaming para system3 (Node.js).
-        Usa gRPC directo y yield chunks IPC a medida que llegan.
+        Varias queries síncronas del mismo tenant en paralelo.
+        Todas comparten el canal gRPC (HTTP/2 multiplexa los streams), así el
+        tiempo total es ~el RTT más lento en lugar de la suma de RTTs.
+        Devuelve los resultados en el mismo orden que datasets.
         """
-        import grpc
-        
-        t0 = time.perf_counter()
-        ttfb = 0
-        total_rows = 0
-        total_bytes = 0
-        chunk_count = 0
-        
-        result = QueryResult(
-            request_id=f"{connector_id}:{dataset}:{t0}",
-            backend=self._backend_name,
-            connector_id=connector_id,
-            dataset=dataset,
-            pattern=QueryPattern.STREAM.value,
-            status="pending",
-            t0_sent=t0
-        )
-        
-        output_handle = None
-        if output_file:
-            output_handle = open(output_file, 'wb')
-        
-        try:
-            # Inicializar stubs si es necesario
-            if not ArrowFlightAdapter._stubs_compiled:
-                self._compile_proto_stubs()
-            
-            flight_pb2 = ArrowFlightAdapter._proto_stubs['pb2']
-            flight_pb2_grpc = ArrowFlightAdapter._proto_stubs['pb2_grpc']
-            
-            # Reutilizar o crear canal gRPC
-            uri = self._flight_uri.replace("grpc://", "")
-            if ArrowFlightAdapter._grpc_channel is None:
-                ArrowFlightAdapter._grpc_channel = grpc.insecure_channel(uri, options=[
-                    ('grpc.max_receive_message_length', 200 * 1024 * 1024),
-                ])
-            
-            stub = flight_pb2_grpc.FlightServiceStub(ArrowFlightAdapter._grpc_channel)
-            
-            # 1. GetFlightInfo
-            path = [connector_id.encode(), dataset.encode()]
-            if rows:
-                path.append(str(rows).encode())
-            
-            descriptor = flight_pb2.FlightDescriptor(
-                type=flight_pb2.FlightDescriptor.PATH,
-                path=path
-            )
-            
-            info = stub.GetFlightInfo(descriptor, timeout=60)
-            
-            if not info.endpoint:
-                result.status = "error"
-                result.error = "No endpoints returned"
-                result.total_time = time.perf_counter() - t0
-                return result
-            
-            # 2. DoGet - streaming chunks
-            ticket = info.endpoint[0].ticket
-            
-            for flight_data in stub.DoGet(flight_pb2.Ticket(ticket=ticket.ticket), timeout=120):
-                if flight_data.data_body and len(flight_data.data_body) > 0:
-                    if chunk_count == 0:
-                        ttfb = time.perf_counter() - t0
-                    
-                    chunk_count += 1
-                    chunk_bytes = flight_data.data_body
-                    total_bytes += len(chunk_bytes)
-                    
-                    # Parsear para contar rows
-                    try:
-                        buffer = pa.py_buffer(chunk_bytes)
-                        reader = pa.ipc.open_stream(buffer)
-                        table = reader.read_all()
-                        total_rows += table.num_rows
-                    except:
-                        pass
-                    
-                    if output_handle:
-                        output_handle.write(chunk_bytes)
-                    
-                    yield chunk_bytes
-            
-            result.status = "success"
-            
-        except Exception as e:
-            result.status = "error"
-            result.error = str(e)
-            logger.error(f"System3 stream error: {e}")
-            
-        finally:
-            if output_handle:
-                output_handle.close()
+        if not datasets:
+            return []
+        
+        workers = min(max_workers, len(datasets))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                lambda ds: self.query_sync(connector_id, ds, timeout, rows),
+                datasets
+            ))
+    
+    @staticmethod
+    def _iter_ipc_stream(
+        reader: flight.FlightStreamReader,
+        target_batch_bytes: int = 0
+    ) -> Generator[Tuple[pa.Buffer, int], None, None]:
+        """
+        Re-encapsula los batches del DoGet como un único stream Arrow IPC.
+        Yield (mensaje IPC, filas del mensaje); el schema se serializa una vez.
         
-        result.total_time = time.perf_counter() - t0
-        result.ttfb = ttfb
-        result.rows = total_rows
-        result.bytes = total_bytes
-        result.calculate_metrics()
+        Los batches pequeños se agrupan hasta target_batch_bytes antes de
+        serializarse (0 = reenviar cada batch tal como llega del servidor).
         
-        return result
+        Sin columnas dictionary cada mensaje es RecordBatch.serialize() (sin
+        copias); con dictionaries se usa un RecordBatchStreamWriter real para
+        que el stream incluya los dictionary batches.
+        """
+        started = False
+        writer = None
+        sink = None
+        pending: List[pa.RecordBatch] = []
+        pending_bytes = 0
+        
+        def encode(batch: pa.RecordBatch) -> pa.Buffer:
+            if writer is None:
+                return batch.serialize()
+            writer.write_batch(batch)
+            return sink.drain()
+        
+        for chunk in reader:
+            batch = chunk.data
+            if not started:
+                started = True
+                schema = reader.schema
+                if any(_has_dictionary(f.type) for f in schema):
+                    # El writer emite el schema junto con el primer batch
+                    sink = _DrainSink()
+                    writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+                else:
+                    yield schema.serialize(), 0
+            if batch.num_rows == 0:
+                continue
+            
+            pending.append(batch)
+            pending_bytes += batch.nbytes
+            if pending_bytes >= target_batch_bytes:
+                merged = _concat_batches(pending)
+                pending = []
+                pending_bytes = 0
+                yield encode(merged), merged.num_rows
+        
+        if pending:
+            merged = _concat_batches(pending)
+            yield encode(merged), merged.num_rows
+        
+        if writer is not None:
+            writer.close()
+            yield sink.drain(), 0
+        elif started:
+            yield _IPC_EOS, 0
+        else:
+            # DoGet sin batches: schema + EOS igual, para que el stream IPC sea válido
+            yield reader.schema.serialize(), 0
+            yield _IPC_EOS, 0
     
     def query_stream(
         self, 
@@ -465,97 +452,88 @@ class ArrowFlightAdapter(IBackendAdapter):
         dataset: str,
         output_file: Optional[str] = None,
         rows: Optional[int] = None,
+        materialize: bool = False,
+        target_batch_bytes: int = DEFAULT_TARGET_BATCH_BYTES,
         **kwargs
-    ) -> Generator[bytes, None, QueryResult]:
+    ) -> Generator[Union[pa.Buffer, bytes], None, QueryResult]:
         """
         Arrow Flight: DoGet con streaming.
         Yield batches Arrow IPC a medida que llegan.
-        """
-        # System3 and System4 use alternative implementation
-        if self._backend_name in ("system3", "system4"):
-            yield from self._query_stream_raw(connector_id, dataset, output_file, rows)
-            return
         
+        Los chunks concatenados forman un único stream IPC (schema una sola
+        vez, un mensaje por batch y marcador EOS), igual que el output_file.
+        Por defecto cada chunk es un pa.Buffer (memoria Arrow, sin copia);
+        soporta len() y el buffer protocol. Con materialize=True se entregan bytes.
+        
+        Los batches del servidor se agrupan hasta target_batch_bytes (0 = sin agrupar).
+        """
         t0 = time.perf_counter()
         ttfb = 0
         total_rows = 0
         total_bytes = 0
         chunks = 0
-        
-        result = QueryResult(
-            request_id=f"{connector_id}:{dataset}:{t0}",
-            backend=self._backend_name,
-            connector_id=connector_id,
-            dataset=dataset,
-            pattern=QueryPattern.STREAM.value,
-            status="pending",
-            t0_sent=t0
-        )
+        status = "pending"
+        error = None
+        metadata_latency = 0.0
         
         output_handle = None
         if output_file:
-            output_handle = open(output_file, 'wb')
+            output_handle = open(output_file, 'wb', buffering=0)
         
         try:
             client = self._get_client()
             
             # 1. GetFlightInfo
-            t_meta_start = time.perf_counter()
-            
-            path_args = [connector_id.encode(), dataset.encode()]
-            if rows:
-                path_args.append(str(rows).encode())
+            descriptor = _make_descriptor(connector_id, dataset, rows)
+            options = self._call_options()
+            info = client.get_flight_info(descriptor, options)
             
-            descriptor = flight.FlightDescriptor.for_path(*path_args)
-            info = client.get_flight_info(descriptor)
-            
-            result.metadata_latency = time.perf_counter() - t_meta_start
+            metadata_latency = time.perf_counter() - t0
             
             if not info.endpoints:
-                result.status = "error"
-                result.error = "No endpoints returned"
-                return result
-            
-            # 2. DoGet streaming
-            endpoint = info.endpoints[0]
-            reader = client.do_get(endpoint.ticket)
-            
-            # Stream batches
-            for chunk in reader:
-                if chunks == 0:
-                    ttfb = time.perf_counter() - t0
+                status = "error"
+                error = "No endpoints returned"
+            else:
+                # 2. DoGet streaming
+                endpoint = info.endpoints[0]
+                reader = client.do_get(endpoint.ticket, options)
                 
-                chunks += 1
-                batch = chunk.data
-                total_rows += batch.num_rows
-                
-                # Serializar a IPC para yield
-                sink = pa.BufferOutputStream()
-                with pa.ipc.new_stream(sink, batch.schema) as writer:
-                    writer.write_batch(batch)
-                
-                ipc_bytes = sink.getvalue().to_pybytes()
-                total_bytes += len(ipc_bytes)
-                
-                if output_handle:
-                    output_handle.write(ipc_bytes)
+                # Stream batches
+                for buf, batch_rows in self._iter_ipc_stream(reader, target_batch_bytes):
+                    if chunks == 0:
+                        ttfb = time.perf_counter() - t0
+                    
+                    chunks += 1
+                    total_rows += batch_rows
+                    total_bytes += buf.size
+                    
+                    if output_handle:
+                        _write_through(output_handle.fileno(), buf)
+                    
+                    yield buf.to_pybytes() if materialize else buf
                 
-                yield ipc_bytes
-            
-            result.status = "success"
+                status = "success"
             
         except Exception as e:
-            result.status = "error"
-            result.error = str(e)
+            status = "error"
+            error = str(e)
             
         finally:
             if output_handle:
                 output_handle.close()
         
-        result.total_time = time.perf_counter() - t0
-        result.ttfb = ttfb
-        result.rows = total_rows
-        result.bytes = total_bytes
-        result.calculate_metrics()
-        
-        return result
+        return QueryResult(
+            request_id=next_request_id(),
+            backend=self._backend_name,
+            connector_id=connector_id,
+            dataset=dataset,
+            pattern=QueryPattern.STREAM.value,
+            status=status,
+            rows=total_rows,
+            bytes=total_bytes,
+            t0_sent=t0,
+            ttfb=ttfb,
+            total_time=time.perf_counter() - t0,
+            metadata_latency=metadata_latency,
+            error=error
+        )
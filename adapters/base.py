@@ -2,12 +2,23 @@
 Base adapter interface for all backends.
 Defines the common contract that all adapters must implement.
 """
+import asyncio
+import itertools
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, Generator, List
+from typing import Optional, Dict, Any, Generator, List, Union
 from enum import Enum
 
 
+# IDs locales monotónicos: evitan formatear strings al inicio del path medido
+_request_ids = itertools.count(1)
+
+
+def next_request_id() -> int:
+    """Siguiente request_id local del proceso (thread-safe bajo el GIL)."""
+    return next(_request_ids)
+
+
 class QueryPattern(Enum):
     """Patrones de comunicación soportados."""
     SYNC = "sync"           # Patrón A: Request-Response síncrono
@@ -15,13 +26,15 @@ class QueryPattern(Enum):
     OFFLOAD = "offload"     # Patrón C: Offload a storage (MinIO)
 
 
-@dataclass
+@dataclass(slots=True, eq=False, kw_only=True)
 class QueryResult:
     """
     Resultado unificado de una consulta.
     Normaliza métricas de todos los tipos de backend.
+    Usa __slots__ (sin __dict__ por instancia) porque se crea una por request;
+    kw_only porque todos los call sites construyen por keyword.
     """
-    request_id: str
+    request_id: Union[str, int]  # ID del servidor (str) o local de next_request_id()
     backend: str
     connector_id: str
     dataset: str
@@ -41,22 +54,25 @@ class QueryResult:
     metadata_latency: float = 0    # Tiempo para obtener metadata (Flight)
     transfer_latency: float = 0    # Tiempo de transferencia de datos
     
-    # Métricas calculadas
-    throughput_bytes_per_sec: float = 0
-    
     # Error info
     error: Optional[str] = None
     
     # Timestamps adicionales del servidor (si disponibles)
     server_timestamps: Dict[str, float] = field(default_factory=dict)
     
-    def calculate_metrics(self):
-        """Calcula métricas derivadas."""
-        if self.total_time > 0 and self.bytes > 0:
-            self.throughput_bytes_per_sec = self.bytes / self.total_time
+    @property
+    def throughput_bytes_per_sec(self) -> float:
+        """
+        Métrica derivada, calculada al leerla (fuera del path medido).
+        Solo es válida para resultados exitosos: error/timeout retornan 0.0
+        aunque hayan recibido bytes parciales.
+        """
+        if self.status == "success" and self.total_time > 0 and self.bytes > 0:
+            return self.bytes / self.total_time
+        return 0.0
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class ConnectorInfo:
     """Información de un conector/tenant conectado."""
     id: str
@@ -100,6 +116,19 @@ class IBackendAdapter(ABC):
         """
         pass
     
+    async def ahealth_check(self) -> bool:
+        """
+        Variante async de health_check para sondear varios backends en paralelo
+        (asyncio.gather). Ejecuta la llamada bloqueante en el executor por defecto.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.health_check)
+    
+    async def alist_connectors(self) -> List[ConnectorInfo]:
+        """Variante async de list_connectors (ver ahealth_check)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.list_connectors)
+    
     @abstractmethod
     def query_sync(
         self, 
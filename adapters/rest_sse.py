@@ -2,12 +2,28 @@
 REST + SSE Adapter for System 1 (luzzi-core-im-enrutador).
 Supports Pattern A (sync), Pattern B (SSE stream), and Pattern C (MinIO offload).
 """
+import os
+import json
+import socket
+import shutil
+import functools
+import itertools
 import time
 import uuid
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
 from typing import List, Optional, Generator, Dict, Any
 import logging
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from .base import (
     IBackendAdapter, 
     QueryResult, 
@@ -17,6 +33,80 @@ from .base import (
 
 logger = logging.getLogger(__name__)
 
+# Tamaño del pool keep-alive por defecto (sobrescribible por env o por parámetro)
+DEFAULT_POOL_SIZE = int(os.environ.get("UNIFIED_EVALUATOR_POOL_SIZE", "10"))
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Opciones de socket del pool: TCP_NODELAY (ya en el default de urllib3, se
+# fuerza por si cambia) + SO_KEEPALIVE para streams/SSE largos sin tráfico.
+SOCKET_OPTIONS = [
+    opt for opt in HTTPConnection.default_socket_options
+    if opt[:2] != (socket.IPPROTO_TCP, socket.TCP_NODELAY)
+] + [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+
+class _BoundedWaitMixin:
+    """
+    Pool de urllib3 con pool_block cuya espera por una conexión libre está acotada:
+    requests no pasa pool_timeout, así que sin esto un worker esperaría para
+    siempre si otra conexión nunca se libera (levanta EmptyPoolError al vencer).
+    """
+    
+    def __init__(self, *args, pool_wait_timeout: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool_wait_timeout = pool_wait_timeout
+    
+    def _get_conn(self, timeout: Optional[float] = None):
+        return super()._get_conn(self._pool_wait_timeout if timeout is None else timeout)
+
+
+class _BoundedWaitHTTPPool(_BoundedWaitMixin, HTTPConnectionPool):
+    pass
+
+
+class _BoundedWaitHTTPSPool(_BoundedWaitMixin, HTTPSConnectionPool):
+    pass
+
+
+class _SocketOptionsAdapter(HTTPAdapter):
+    """
+    HTTPAdapter cuyas conexiones se abren con SOCKET_OPTIONS y cuyos pools
+    esperan como mucho pool_wait_timeout segundos por una conexión libre.
+    """
+    
+    def __init__(self, *args, pool_wait_timeout: Optional[float] = None, **kwargs):
+        # Se asigna antes de super().__init__, que llama a init_poolmanager
+        self._pool_wait_timeout = pool_wait_timeout
+        super().__init__(*args, **kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": functools.partial(_BoundedWaitHTTPPool, pool_wait_timeout=self._pool_wait_timeout),
+            "https": functools.partial(_BoundedWaitHTTPSPool, pool_wait_timeout=self._pool_wait_timeout),
+        }
+
+
+@functools.lru_cache(maxsize=256)
+def _encode_body(mac_address: str, dataset: str) -> bytes:
+    """Body JSON de request-sync/stream/offload, serializado una vez por (mac, dataset)."""
+    body = {"mac_address": mac_address, "dataset_name": dataset}
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(body)
+    return json.dumps(body, separators=(",", ":")).encode()
+
+
+def _loads(content: bytes) -> Any:
+    """Parsea un body JSON (orjson si está disponible; acepta bytes o str)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
 
 class RestSSEAdapter(IBackendAdapter):
     """
@@ -30,14 +120,37 @@ class RestSSEAdapter(IBackendAdapter):
         timeout: int = 60,
         poll_interval_ms: int = 500,
         max_poll_attempts: int = 120,
-        backend_name: str = "system1"
+        backend_name: str = "system1",
+        pool_size: Optional[int] = None,
+        use_sse: bool = True,
+        max_retries: int = 0
     ):
         self._base_url = base_url.rstrip("/")
         self._timeout = timeout
         self._poll_interval = poll_interval_ms / 1000.0
         self._max_poll_attempts = max_poll_attempts
         self._backend_name = backend_name
+        self._use_sse = use_sse  # Offload: esperar evento SSE (fallback a polling)
+        
+        # Pool keep-alive dimensionado a la concurrencia: sin él, con más de 10
+        # workers urllib3 descarta conexiones y cada request repite el handshake.
+        # pool_block: si el pool se agota se espera una conexión libre en vez de
+        # abrir una extra (TCP/TLS nuevo) que luego se descarta; la espera se
+        # acota a timeout segundos para que una conexión no liberada se registre
+        # como error en vez de colgar al resto de los workers.
+        # max_retries=0 por defecto: un reintento silencioso inflaría la latencia medida.
+        pool_size = pool_size or DEFAULT_POOL_SIZE
+        http_adapter = _SocketOptionsAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            pool_wait_timeout=timeout,
+            max_retries=Retry(total=max_retries, backoff_factor=0.2 if max_retries else 0)
+        )
         self._session = requests.Session()
+        self._session.mount("http://", http_adapter)
+        self._session.mount("https://", http_adapter)
+        self._session.headers["Connection"] = "keep-alive"
     
     @property
     def name(self) -> str:
@@ -56,7 +169,7 @@ class RestSSEAdapter(IBackendAdapter):
             )
             return response.status_code == 200
         except Exception as e:
-            logger.error(f"Health check failed: {e}")
+            logger.error("Health check failed: %s", e)
             return False
     
     def list_connectors(self) -> List[ConnectorInfo]:
@@ -67,7 +180,7 @@ class RestSSEAdapter(IBackendAdapter):
                 timeout=self._timeout
             )
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response.content)
             
             connectors = []
             for c in data.get("connectors", []):
@@ -81,7 +194,7 @@ class RestSSEAdapter(IBackendAdapter):
             return connectors
             
         except Exception as e:
-            logger.error(f"Error listing connectors: {e}")
+            logger.error("Error listing connectors: %s", e)
             return []
     
     def query_sync(
@@ -112,10 +225,8 @@ class RestSSEAdapter(IBackendAdapter):
             # Llamar endpoint síncrono
             response = self._session.post(
                 f"{self._base_url}/datasets/request-sync",
-                json={
-                    "mac_address": connector_id,
-                    "dataset_name": dataset
-                },
+                data=_encode_body(connector_id, dataset),
+                headers=JSON_HEADERS,
                 timeout=timeout
             )
             
@@ -124,7 +235,7 @@ class RestSSEAdapter(IBackendAdapter):
             result.ttfb = result.total_time  # En sync, TTFB = total time
             
             if response.status_code == 200:
-                data = response.json()
+                data = _loads(response.content)
                 result.status = "success"
                 result.request_id = data.get("request_id", request_id)
                 
@@ -152,7 +263,6 @@ class RestSSEAdapter(IBackendAdapter):
             result.error = str(e)
             result.total_time = time.perf_counter() - t0
         
-        result.calculate_metrics()
         return result
     
     def query_stream(
@@ -166,12 +276,19 @@ class RestSSEAdapter(IBackendAdapter):
         Patrón B: Solicita dataset via streaming.
         1. POST /datasets/request-stream para iniciar
         2. GET /datasets/stream/{request_id} para consumir
+        
+        El fin del stream lo marca el propio HTTP (chunk de longitud cero de
+        Transfer-Encoding: chunked, o cierre del body): no hay marcador en los datos.
+        
+        Con output_file y teeless=True no se hace yield de chunks: el socket se
+        copia a disco con shutil.copyfileobj, sin un objeto bytes por chunk.
         """
+        teeless = bool(output_file) and kwargs.get("teeless", False)
         t0 = time.perf_counter()
         ttfb = 0
         total_bytes = 0
-        chunks_received = 0
         request_id = None
+        stream_response = None
         
         result = QueryResult(
             request_id="pending",
@@ -191,14 +308,12 @@ class RestSSEAdapter(IBackendAdapter):
             # 1. Iniciar request de streaming
             init_response = self._session.post(
                 f"{self._base_url}/datasets/request-stream",
-                json={
-                    "mac_address": connector_id,
-                    "dataset_name": dataset
-                },
+                data=_encode_body(connector_id, dataset),
+                headers=JSON_HEADERS,
                 timeout=30
             )
             init_response.raise_for_status()
-            init_data = init_response.json()
+            init_data = _loads(init_response.content)
             request_id = init_data.get("request_id")
             result.request_id = request_id
             
@@ -210,31 +325,31 @@ class RestSSEAdapter(IBackendAdapter):
             )
             stream_response.raise_for_status()
             
-            # Procesar stream binario
-            for chunk in stream_response.iter_content(chunk_size=65536):
-                if chunk:
-                    # Registrar TTFB en primer chunk
-                    if chunks_received == 0:
-                        ttfb = time.perf_counter() - t0
-                    
-                    chunks_received += 1
-                    
-                    # Verificar si es marcador de fin
-                    if b'---STREAM_COMPLETE---' in chunk:
-                        # Extraer datos antes del marcador
-                        parts = chunk.split(b'---STREAM_COMPLETE---')
-                        if parts[0]:
-                            total_bytes += len(parts[0])
-                            if output_handle:
-                                output_handle.write(parts[0])
-                            yield parts[0]
-                        break
-                    
+            if teeless:
+                # Fast path sin yields: socket -> archivo en bloques de 1 MiB
+                raw = stream_response.raw
+                raw.decode_content = True
+                first = raw.read(65536)
+                ttfb = time.perf_counter() - t0
+                if first:
+                    output_handle.write(first)
+                    shutil.copyfileobj(raw, output_handle, 1048576)
+                total_bytes = output_handle.tell()
+            else:
+                # Procesar stream binario
+                chunks = stream_response.iter_content(chunk_size=65536)
+                
+                # TTFB se mide sobre el primer chunk, fuera del loop
+                first = next(chunks, None)
+                if first is not None:
+                    ttfb = time.perf_counter() - t0
+                    chunks = itertools.chain((first,), chunks)
+                
+                write = output_handle.write if output_handle else None
+                for chunk in chunks:
                     total_bytes += len(chunk)
-                    
-                    if output_handle:
-                        output_handle.write(chunk)
-                    
+                    if write:
+                        write(chunk)
                     yield chunk
             
             result.status = "success"
@@ -242,9 +357,11 @@ class RestSSEAdapter(IBackendAdapter):
         except Exception as e:
             result.status = "error"
             result.error = str(e)
-            logger.error(f"Stream error: {e}")
+            logger.error("Stream error: %s", e)
             
         finally:
+            if stream_response is not None:
+                stream_response.close()  # Devuelve la conexión al pool aunque haya error
             if output_handle:
                 output_handle.close()
         
@@ -252,10 +369,66 @@ class RestSSEAdapter(IBackendAdapter):
         result.total_time = time.perf_counter() - t0
         result.ttfb = ttfb
         result.bytes = total_bytes
-        result.calculate_metrics()
         
         return result
     
+    def _wait_for_offload(self, request_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Espera el estado final de un offload suscribiéndose a /datasets/{id}/events (SSE).
+        Retorna el payload del evento `status` final (completed | error), o None si
+        el servidor no expone el endpoint, el stream termina sin estado final o
+        falla (timeout de lectura, HTTP de error): en todos esos casos se hace polling.
+        Tras un 404/405/501 deja de intentar SSE en esta instancia.
+        """
+        try:
+            with self._session.get(
+                f"{self._base_url}/datasets/{request_id}/events",
+                headers={"Accept": "text/event-stream"},
+                stream=True,
+                timeout=timeout
+            ) as response:
+                if response.status_code in (404, 405, 501):
+                    logger.debug("Offload events not supported (HTTP %s), using polling", response.status_code)
+                    self._use_sse = False
+                    return None
+                response.raise_for_status()
+                
+                event = None
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line:
+                        event = None  # Línea vacía = fin del evento
+                    elif line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:") and event == "status":
+                        data = _loads(line[5:])
+                        if data.get("status") in ("completed", "error"):
+                            return data
+        
+        except (requests.RequestException, ValueError) as e:
+            # ValueError: payload JSON inválido en un evento
+            logger.debug("Offload events failed, falling back to polling: %s", e)
+        
+        return None
+    
+    def _poll_offload_status(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Polling de /datasets/{id}/status hasta estado final.
+        Retorna el payload final (completed | error) o None si se agotan los intentos.
+        """
+        for _ in range(self._max_poll_attempts):
+            status_response = self._session.get(
+                f"{self._base_url}/datasets/{request_id}/status",
+                timeout=10
+            )
+            status_data = _loads(status_response.content)
+            
+            if status_data.get("status") in ("completed", "error"):
+                return status_data
+                
+            time.sleep(self._poll_interval)
+        
+        return None
+    
     def query_offload(
         self, 
         connector_id: str, 
@@ -267,6 +440,8 @@ class RestSSEAdapter(IBackendAdapter):
         """
         Patrón C: Solicita dataset con offload a MinIO.
         El Conector sube a MinIO y recibimos URL de descarga.
+        La espera usa el stream SSE de eventos del request (una sola conexión);
+        si el servidor no lo expone se hace polling de /status.
         """
         request_id = str(uuid.uuid4())
         t0 = time.perf_counter()
@@ -285,50 +460,53 @@ class RestSSEAdapter(IBackendAdapter):
             # 1. Iniciar request
             response = self._session.post(
                 f"{self._base_url}/datasets/request-offload",
-                json={
-                    "mac_address": connector_id,
-                    "dataset_name": dataset
-                },
+                data=_encode_body(connector_id, dataset),
+                headers=JSON_HEADERS,
                 timeout=30
             )
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response.content)
             result.request_id = data.get("request_id", request_id)
             
-            # 2. Polling hasta obtener download_url
+            # 2. Esperar download_url: evento SSE si el servidor lo soporta, si no polling
+            status_data = None
+            if self._use_sse:
+                status_data = self._wait_for_offload(result.request_id, self._timeout)
+            if status_data is None:
+                status_data = self._poll_offload_status(result.request_id)
+            
             download_url = None
-            for _ in range(self._max_poll_attempts):
-                status_response = self._session.get(
-                    f"{self._base_url}/datasets/{result.request_id}/status",
-                    timeout=10
-                )
-                status_data = status_response.json()
-                
+            if status_data is not None:
                 if status_data.get("status") == "completed":
                     download_url = status_data.get("download_url")
                     result.server_timestamps = status_data.get("timestamps", {})
-                    break
-                elif status_data.get("status") == "error":
+                else:
                     result.status = "error"
                     result.error = status_data.get("error", "Unknown error")
-                    break
-                    
-                time.sleep(self._poll_interval)
             
             # 3. Descargar desde MinIO si tenemos URL
             if download_url:
                 result.ttfb = time.perf_counter() - t0
                 
                 download_response = self._session.get(download_url, stream=True)
-                download_response.raise_for_status()
-                
-                content = download_response.content
-                result.bytes = len(content)
                 
-                if output_file:
-                    with open(output_file, 'wb') as f:
-                        f.write(content)
+                # Descarga en chunks de 1 MiB directo a disco: memoria O(chunk), no O(objeto)
+                total = 0
+                output_handle = None
+                with download_response:
+                    download_response.raise_for_status()
+                    output_handle = open(output_file, 'wb') if output_file else None
+                    try:
+                        for chunk in download_response.iter_content(chunk_size=1048576):
+                            if chunk:
+                                total += len(chunk)
+                                if output_handle:
+                                    output_handle.write(chunk)
+                    finally:
+                        if output_handle:
+                            output_handle.close()
                 
+                result.bytes = total
                 result.status = "success"
             elif result.status == "pending":
                 result.status = "timeout"
@@ -339,5 +517,4 @@ class RestSSEAdapter(IBackendAdapter):
             result.error = str(e)
         
         result.total_time = time.perf_counter() - t0
-        result.calculate_metrics()
         return result
@@ -0,0 +1,193 @@
+"""
+Async REST + SSE Adapter for System 1 (luzzi-core-im-enrutador).
+Same endpoints as RestSSEAdapter, driven by aiohttp so a single event loop
+can keep thousands of requests in flight during load tests.
+"""
+import time
+import uuid
+import asyncio
+import logging
+from typing import Optional
+
+import aiohttp
+
+from .base import QueryResult, QueryPattern
+from .rest_sse import RestSSEAdapter, _encode_body, _loads, JSON_HEADERS
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRestSSEAdapter(RestSSEAdapter):
+    """
+    Variante asyncio de RestSSEAdapter.
+    health_check/list_connectors/query_offload se heredan (síncronos);
+    los patrones del hot path (sync y stream) tienen versión async sobre aiohttp.
+    """
+    
+    def __init__(self, *args, concurrency: int = 100, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._concurrency = concurrency
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+    
+    def _get_aio_session(self) -> aiohttp.ClientSession:
+        """Sesión aiohttp lazy (debe crearse dentro del event loop que la usa)."""
+        if self._aio_session is None or self._aio_session.closed:
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._concurrency,
+                    keepalive_timeout=60,
+                    ttl_dns_cache=300
+                )
+            )
+        return self._aio_session
+    
+    async def aclose(self):
+        """Cierra la sesión aiohttp (llamar antes de cerrar el event loop)."""
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+    
+    async def query_sync_async(
+        self,
+        connector_id: str,
+        dataset: str,
+        timeout: int = 60,
+        **kwargs
+    ) -> QueryResult:
+        """Patrón A async: POST /datasets/request-sync y espera la respuesta."""
+        request_id = str(uuid.uuid4())
+        t0 = time.perf_counter()
+        
+        result = QueryResult(
+            request_id=request_id,
+            backend=self._backend_name,
+            connector_id=connector_id,
+            dataset=dataset,
+            pattern=QueryPattern.SYNC.value,
+            status="pending",
+            t0_sent=t0
+        )
+        
+        try:
+            session = self._get_aio_session()
+            async with session.post(
+                f"{self._base_url}/datasets/request-sync",
+                data=_encode_body(connector_id, dataset),
+                headers=JSON_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                body = await response.read()
+            
+            result.total_time = time.perf_counter() - t0
+            result.ttfb = result.total_time  # En sync, TTFB = total time
+            
+            if response.status == 200:
+                data = _loads(body)
+                result.status = "success"
+                result.request_id = data.get("request_id", request_id)
+                
+                if "data" in data:
+                    result.bytes = len(data["data"]) if isinstance(data["data"], str) else 0
+                if "data_size_bytes" in data:
+                    result.bytes = data["data_size_bytes"]
+                if "timestamps" in data:
+                    result.server_timestamps = data["timestamps"]
+            else:
+                text = body.decode("utf-8", errors="replace")
+                result.status = "error"
+                result.error = f"HTTP {response.status}: {text[:200]}"
+        
+        except asyncio.TimeoutError:
+            result.status = "timeout"
+            result.error = f"Timeout after {timeout}s"
+            result.total_time = time.perf_counter() - t0
+        
+        except Exception as e:
+            result.status = "error"
+            result.error = str(e)
+            result.total_time = time.perf_counter() - t0
+        
+        return result
+    
+    async def query_stream_async(
+        self,
+        connector_id: str,
+        dataset: str,
+        output_file: Optional[str] = None,
+        **kwargs
+    ) -> QueryResult:
+        """
+        Patrón B async: inicia el stream y lo consume completo.
+        A diferencia de query_stream no hace yield de chunks: devuelve solo las métricas.
+        """
+        t0 = time.perf_counter()
+        ttfb = 0
+        total_bytes = 0
+        
+        result = QueryResult(
+            request_id="pending",
+            backend=self._backend_name,
+            connector_id=connector_id,
+            dataset=dataset,
+            pattern=QueryPattern.STREAM.value,
+            status="pending",
+            t0_sent=t0
+        )
+        
+        output_handle = None
+        if output_file:
+            output_handle = open(output_file, 'wb')
+        
+        try:
+            session = self._get_aio_session()
+            
+            # 1. Iniciar request de streaming
+            async with session.post(
+                f"{self._base_url}/datasets/request-stream",
+                data=_encode_body(connector_id, dataset),
+                headers=JSON_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as init_response:
+                init_response.raise_for_status()
+                init_data = _loads(await init_response.read())
+            request_id = init_data.get("request_id")
+            result.request_id = request_id
+            
+            # 2. Consumir el stream
+            async with session.get(
+                f"{self._base_url}/datasets/stream/{request_id}",
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=self._timeout)
+            ) as stream_response:
+                stream_response.raise_for_status()
+                
+                content = stream_response.content
+                
+                # TTFB se mide sobre el primer chunk, fuera del loop
+                chunk = await content.read(65536)
+                if chunk:
+                    ttfb = time.perf_counter() - t0
+                
+                # Fin de stream = fin del body HTTP (read() retorna b'')
+                write = output_handle.write if output_handle else None
+                while chunk:
+                    total_bytes += len(chunk)
+                    if write:
+                        write(chunk)
+                    chunk = await content.read(65536)
+            
+            result.status = "success"
+        
+        except Exception as e:
+            result.status = "error"
+            result.error = str(e)
+            logger.error("Stream error: %s", e)
+        
+        finally:
+            if output_handle:
+                output_handle.close()
+        
+        result.total_time = time.perf_counter() - t0
+        result.ttfb = ttfb
+        result.bytes = total_bytes
+        
+        return result
@@ -3,16 +3,22 @@ Unified Load Tester.
 Runs concurrent requests against any backend adapter.
 """
 import time
+import asyncio
+import itertools
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Optional, Callable
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Callable, Tuple
 from dataclasses import dataclass
 
-from adapters.base import IBackendAdapter, QueryResult, QueryPattern
-from metrics import MetricsCollector, LoadTestMetrics
+from adapters.base import IBackendAdapter, QueryResult, QueryPattern, next_request_id
+from metrics import MetricsCollector, LoadTestMetrics, LoadTestAggregator
 
 logger = logging.getLogger(__name__)
 
+# Default de LoadTestConfig.flush_every: resultados entre flushes del CSV
+CSV_FLUSH_EVERY = 1000
+
 
 @dataclass
 class LoadTestConfig:
@@ -24,6 +30,9 @@ class LoadTestConfig:
     pattern: QueryPattern = QueryPattern.SYNC
     rows: Optional[int] = None
     output_file: Optional[str] = None
+    engine: str = "thread"  # thread | gevent (ver load_tester_gevent.py)
+    keep_raw: bool = False  # percentiles exactos en vez de HdrHistogram
+    flush_every: int = CSV_FLUSH_EVERY  # flush del CSV cada N resultados (0 = solo al final)
 
 
 class LoadTester:
@@ -34,6 +43,29 @@ class LoadTester:
     def __init__(self, adapter: IBackendAdapter):
         self.adapter = adapter
         self.metrics = MetricsCollector()
+        self._flush_every = CSV_FLUSH_EVERY
+    
+    def _error_result(
+        self,
+        connector_id: str,
+        dataset: str,
+        pattern: QueryPattern,
+        error: Exception
+    ) -> QueryResult:
+        """
+        QueryResult de error para fallas del driver.
+        Usa next_request_id() en vez de formatear time.time(): en una tormenta
+        de errores (backend caído) esto es la mayor parte del costo por request.
+        """
+        return QueryResult(
+            request_id=next_request_id(),
+            backend=self.adapter.name,
+            connector_id=connector_id,
+            dataset=dataset,
+            pattern=pattern.value,
+            status="error",
+            error=str(error)
+        )
     
     def _execute_single_request(
         self,
@@ -51,43 +83,17 @@ class LoadTester:
                     rows=rows
                 )
             elif pattern == QueryPattern.STREAM:
-                # Para stream, consumimos el generator y construimos result manualmente
-                t0 = time.perf_counter()
-                ttfb = 0
-                total_bytes = 0
-                chunks = 0
-                
-                try:
-                    gen = self.adapter.query_stream(
-                        connector_id=connector_id,
-                        dataset=dataset
-                    )
-                    for chunk in gen:
-                        if chunks == 0:
-                            ttfb = time.perf_counter() - t0
-                        chunks += 1
-                        total_bytes += len(chunk)
-                    
-                    status = "success"
-                    error = None
-                except Exception as e:
-                    status = "error"
-                    error = str(e)
-                
-                total_time = time.perf_counter() - t0
-                
-                return QueryResult(
-                    request_id=f"{connector_id}:{dataset}:{t0}",
-                    backend=self.adapter.name,
+                # El generator ya mide TTFB/bytes y retorna el QueryResult al agotarse
+                gen = self.adapter.query_stream(
                     connector_id=connector_id,
                     dataset=dataset,
-                    pattern=pattern.value,
-                    status=status,
-                    bytes=total_bytes,
-                    ttfb=ttfb,
-                    total_time=total_time,
-                    error=error
+                    rows=rows
                 )
+                try:
+                    while True:
+                        next(gen)
+                except StopIteration as stop:
+                    return stop.value
             elif pattern == QueryPattern.OFFLOAD:
                 return self.adapter.query_offload(
                     connector_id=connector_id,
@@ -95,33 +101,51 @@ class LoadTester:
                 )
             else:
                 raise ValueError(f"Unsupported pattern: {pattern}")
-                
+        
         except Exception as e:
-            return QueryResult(
-                request_id=f"error-{time.time()}",
-                backend=self.adapter.name,
-                connector_id=connector_id,
-                dataset=dataset,
-                pattern=pattern.value,
-                status="error",
-                error=str(e)
-            )
+            return self._error_result(connector_id, dataset, pattern, e)
     
-    def run(
+    async def _execute_single_request_async(
         self,
-        config: LoadTestConfig,
-        progress_callback: Optional[Callable[[int, int], None]] = None
-    ) -> LoadTestMetrics:
+        connector_id: str,
+        dataset: str,
+        pattern: QueryPattern,
+        rows: Optional[int] = None,
+        executor: Optional[ThreadPoolExecutor] = None
+    ) -> QueryResult:
         """
-        Ejecuta load test.
-        
-        Args:
-            config: Configuración del test
-            progress_callback: Callback(completed, total) para progreso
-            
-        Returns:
-            LoadTestMetrics con resultados agregados
+        Ejecuta una request en el event loop (adapters con query_*_async).
+        Los patrones sin versión async corren en executor (None = el del loop).
         """
+        try:
+            if pattern == QueryPattern.SYNC:
+                return await self.adapter.query_sync_async(
+                    connector_id=connector_id,
+                    dataset=dataset,
+                    rows=rows
+                )
+            elif pattern == QueryPattern.STREAM:
+                return await self.adapter.query_stream_async(
+                    connector_id=connector_id,
+                    dataset=dataset
+                )
+            else:
+                # Sin versión async: ejecutar la versión bloqueante en el executor
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    executor,
+                    self._execute_single_request,
+                    connector_id,
+                    dataset,
+                    pattern,
+                    rows
+                )
+        
+        except Exception as e:
+            return self._error_result(connector_id, dataset, pattern, e)
+    
+    def _prepare(self, config: LoadTestConfig) -> List[str]:
+        """Valida el pattern y resuelve los connector IDs del test."""
         # Validar pattern soportado
         if config.pattern not in self.adapter.supported_patterns:
             raise ValueError(
@@ -137,68 +161,176 @@ class LoadTester:
             if not connector_ids:
                 connector_ids = ["default"]
         
+        if config.output_file:
+            self.metrics.output_file = config.output_file
+        self._flush_every = config.flush_every
+        
         logger.info(
-            f"Starting load test: {config.total_requests} requests, "
-            f"{config.concurrency} concurrent, pattern={config.pattern.value}"
+            "Starting load test: %d requests, %d concurrent, pattern=%s",
+            config.total_requests, config.concurrency, config.pattern.value
         )
         
-        results: List[QueryResult] = []
-        completed = 0
+        return connector_ids
+    
+    @staticmethod
+    def _round_robin(connector_ids: List[str], total: int) -> Iterator[str]:
+        """Connector de cada request, en round-robin (sin len()/módulo por request)."""
+        if len(connector_ids) == 1:
+            return itertools.repeat(connector_ids[0], total)
+        return itertools.islice(itertools.cycle(connector_ids), total)
+    
+    def _record(
+        self,
+        result: QueryResult,
+        aggregator: LoadTestAggregator,
+        row: Optional[Tuple] = None
+    ):
+        """Agrega un resultado completado y vuelca el CSV cada config.flush_every."""
+        aggregator.add(result)
+        self.metrics.add_result(result, row)
+        if self._flush_every and aggregator.total % self._flush_every == 0:
+            self.metrics.save_to_csv()
+    
+    def _finish(
+        self,
+        config: LoadTestConfig,
+        aggregator: LoadTestAggregator,
+        duration: float
+    ) -> LoadTestMetrics:
+        """Calcula métricas agregadas y vuelca los resultados individuales pendientes."""
+        metrics = aggregator.to_metrics(duration)
+        
+        # Volcar las filas que queden en el buffer
+        self.metrics.save_to_csv()
+        self.metrics.close()
+        
+        logger.info(
+            "Load test complete: %d/%d successful, %.2f req/s, avg latency %.2fms",
+            metrics.successful, metrics.total_requests,
+            metrics.requests_per_second, metrics.avg_latency_ms
+        )
+        
+        return metrics
+    
+    def run(
+        self,
+        config: LoadTestConfig,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> LoadTestMetrics:
+        """
+        Ejecuta load test.
+        Si el adapter es async (query_sync_async), delega en run_async.
+        
+        Args:
+            config: Configuración del test
+            progress_callback: Callback(completed, total) para progreso
+        
+        Returns:
+            LoadTestMetrics con resultados agregados
+        """
+        if hasattr(self.adapter, "query_sync_async"):
+            return asyncio.run(self.run_async(config, progress_callback))
+        
+        connector_ids = self._prepare(config)
+        
+        aggregator = LoadTestAggregator(keep_raw=config.keep_raw)
+        
+        # Cada worker publica su resultado con la fila CSV ya formateada;
+        # el thread principal solo hace get()
+        done_queue: "queue.SimpleQueue[Tuple[QueryResult, Tuple]]" = queue.SimpleQueue()
+        csv_row = self.metrics.csv_row
+        
+        def run_and_report(connector_id: str):
+            try:
+                result = self._execute_single_request(
+                    connector_id,
+                    config.dataset,
+                    config.pattern,
+                    config.rows
+                )
+            except Exception as e:
+                logger.error("Request failed: %s", e)
+                result = self._error_result(connector_id, config.dataset, config.pattern, e)
+            # Publicar siempre: si csv_row falla, add_result reintenta el
+            # formateo en el thread principal y el error se propaga ahí
+            row = None
+            try:
+                row = csv_row(result)
+            finally:
+                done_queue.put((result, row))
         
         t_start = time.perf_counter()
         
         with ThreadPoolExecutor(max_workers=config.concurrency) as executor:
-            futures = []
+            # Round-robin connector selection
+            for connector_id in self._round_robin(connector_ids, config.total_requests):
+                executor.submit(run_and_report, connector_id)
             
-            for i in range(config.total_requests):
-                # Round-robin connector selection
-                connector_id = connector_ids[i % len(connector_ids)]
+            # Recolectar resultados en orden de finalización
+            for completed in range(1, config.total_requests + 1):
+                result, row = done_queue.get()
+                self._record(result, aggregator, row)
                 
-                future = executor.submit(
-                    self._execute_single_request,
+                if progress_callback:
+                    progress_callback(completed, config.total_requests)
+        
+        t_end = time.perf_counter()
+        duration = t_end - t_start
+        
+        return self._finish(config, aggregator, duration)
+    
+    async def run_async(
+        self,
+        config: LoadTestConfig,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> LoadTestMetrics:
+        """
+        Ejecuta load test sobre un único event loop.
+        config.concurrency limita las requests en vuelo (asyncio.Semaphore)
+        en lugar del número de threads.
+        """
+        connector_ids = self._prepare(config)
+        semaphore = asyncio.Semaphore(config.concurrency)
+        
+        # Executor propio para los patrones sin versión async (p.ej. OFFLOAD):
+        # el default del loop (min(32, cpu+4) threads) acotaría la concurrencia
+        executor = ThreadPoolExecutor(max_workers=config.concurrency)
+        
+        async def bounded(connector_id: str) -> QueryResult:
+            async with semaphore:
+                return await self._execute_single_request_async(
                     connector_id,
                     config.dataset,
                     config.pattern,
-                    config.rows
+                    config.rows,
+                    executor
                 )
-                futures.append(future)
+        
+        aggregator = LoadTestAggregator(keep_raw=config.keep_raw)
+        completed = 0
+        
+        t_start = time.perf_counter()
+        
+        try:
+            tasks = [
+                asyncio.create_task(bounded(connector_id))
+                for connector_id in self._round_robin(connector_ids, config.total_requests)
+            ]
             
             # Recolectar resultados
-            for future in as_completed(futures):
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    logger.error(f"Request failed: {e}")
-                    results.append(QueryResult(
-                        request_id=f"error-{time.time()}",
-                        backend=self.adapter.name,
-                        connector_id="unknown",
-                        dataset=config.dataset,
-                        pattern=config.pattern.value,
-                        status="error",
-                        error=str(e)
-                    ))
+            for next_done in asyncio.as_completed(tasks):
+                self._record(await next_done, aggregator)
                 
                 completed += 1
                 if progress_callback:
                     progress_callback(completed, config.total_requests)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            aclose = getattr(self.adapter, "aclose", None)
+            if aclose:
+                await aclose()
         
         t_end = time.perf_counter()
         duration = t_end - t_start
         
-        # Calcular métricas agregadas
-        metrics = MetricsCollector.calculate_load_test_metrics(results, duration)
-        
-        # Guardar resultados individuales
-        self.metrics.add_results(results)
-        if config.output_file:
-            self.metrics.output_file = config.output_file
-        self.metrics.save_to_csv()
-        
-        logger.info(
-            f"Load test complete: {metrics.successful}/{metrics.total_requests} successful, "
-            f"{metrics.requests_per_second:.2f} req/s, avg latency {metrics.avg_latency_ms:.2f}ms"
-        )
-        
-        return metrics
+        return self._finish(config, aggregator, duration)
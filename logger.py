@@ -1,10 +1,48 @@
 """
 Logging configuration for unified evaluator.
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
 from typing import Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Listener activo (escribe a stdout desde su propio thread)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por record; timestamp = record.created (epoch, sin strftime)."""
+    
+    def format(self, record):
+        log_data = {
+            "timestamp": record.created,
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "module": record.module
+        }
+        if record.exc_info:
+            log_data["exception"] = self.formatException(record.exc_info)
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(log_data).decode()
+        return json.dumps(log_data)
+
+
+def _stop_listener():
+    """Vacía la cola y detiene el listener (registrado en atexit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def setup_logger(
     level: str = "INFO",
@@ -12,11 +50,13 @@ def setup_logger(
 ) -> logging.Logger:
     """
     Configura el logger principal.
+    Los records se formatean en el thread que loguea y se encolan; un
+    QueueListener hace la escritura a stdout, así el I/O no bloquea las requests.
     
     Args:
         level: Nivel de logging (DEBUG, INFO, WARNING, ERROR)
         format_type: "text" o "json"
-        
+    
     Returns:
         Logger configurado
     """
@@ -25,33 +65,29 @@ def setup_logger(
     
     # Limpiar handlers existentes
     logger.handlers = []
-    
-    # Handler para stdout
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(logging.DEBUG)
+    _stop_listener()
     
     if format_type == "json":
-        import json
-        
-        class JsonFormatter(logging.Formatter):
-            def format(self, record):
-                log_data = {
-                    "timestamp": self.formatTime(record),
-                    "level": record.levelname,
-                    "message": record.getMessage(),
-                    "module": record.module
-                }
-                if record.exc_info:
-                    log_data["exception"] = self.formatException(record.exc_info)
-                return json.dumps(log_data)
-        
         formatter = JsonFormatter()
     else:
         formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
         )
     
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    # Handler para stdout (lo ejecuta el listener)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setLevel(logging.DEBUG)
+    
+    # QueueHandler.prepare() deja la línea ya formateada en record.msg
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.setFormatter(formatter)
+    logger.addHandler(queue_handler)
+    
+    global _listener
+    _listener = logging.handlers.QueueListener(queue_handler.queue, handler)
+    _listener.start()
     
     return logger
+
+
+atexit.register(_stop_listener)
@@ -8,17 +8,32 @@ Uso:
     python main.py --backend system2 query tenant_id dataset
     python main.py --backend system3 load-test --requests 100 --concurrency 10
 """
-import argparse
 import sys
+
+# --engine gevent: el monkey-patch debe aplicarse antes de importar requests,
+# urllib3, ssl o aiohttp (si no, esas referencias a socket/ssl quedan bloqueantes)
+if "--engine=gevent" in sys.argv or any(
+    arg == "--engine" and value == "gevent"
+    for arg, value in zip(sys.argv, sys.argv[1:])
+):
+    try:
+        from gevent import monkey
+        monkey.patch_all()
+    except ImportError:
+        pass  # main() reporta que falta gevent
+
+import argparse
+import os
 import json
+import itertools
 from pathlib import Path
 from typing import Optional
 
 import yaml
 
-from adapters import RestSSEAdapter, ArrowFlightAdapter, IBackendAdapter, QueryPattern
+from adapters import RestSSEAdapter, AsyncRestSSEAdapter, ArrowFlightAdapter, IBackendAdapter, QueryPattern
 from metrics import MetricsCollector, LoadTestMetrics
-from load_tester import LoadTester, LoadTestConfig
+from load_tester import LoadTester, LoadTestConfig, CSV_FLUSH_EVERY
 from logger import setup_logger
 
 # Rich para output bonito
@@ -31,18 +46,55 @@ try:
 except ImportError:
     RICH_AVAILABLE = False
 
+# Loader YAML en C (LibYAML) si PyYAML se compiló con él
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# orjson opcional para el export JSON
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Bytes -> MiB para mostrar resultados (una multiplicación en vez de dos divisiones)
+_INV_MIB = 1.0 / (1024 * 1024)
+
+# consume_stream_query junta chunks hasta este tamaño antes de escribir
+STREAM_WRITE_BATCH = 1 << 20
+
+# Máximo de iovecs por llamada a writev
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
 
 def load_config(config_path: str = "config.yaml") -> dict:
     """Carga configuración desde YAML."""
     path = Path(config_path)
     if path.exists():
-        with open(path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f) or {}
+        with open(path, 'rb') as f:
+            return yaml.load(f, Loader=YAML_LOADER) or {}
     return {}
 
 
-def create_adapter(backend_name: str, config: dict) -> IBackendAdapter:
-    """Crea el adapter apropiado para el backend."""
+def create_adapter(
+    backend_name: str,
+    config: dict,
+    pool_size: Optional[int] = None,
+    async_io: bool = False
+) -> IBackendAdapter:
+    """
+    Crea el adapter apropiado para el backend.
+    pool_size: conexiones HTTP keep-alive (p.ej. la concurrencia del load test);
+    nunca menos que el pool_size de config (default 10).
+    En arrow_flight es el número de canales gRPC, acotado por max_channels
+    (cada canal ya multiplexa muchos DoGet sobre HTTP/2).
+    async_io: para rest_sse, usar AsyncRestSSEAdapter (aiohttp); el LoadTester
+    lo detecta y corre sobre un event loop en vez de threads.
+    """
     backends = config.get("backends", {})
     
     if backend_name not in backends:
@@ -53,19 +105,32 @@ def create_adapter(backend_name: str, config: dict) -> IBackendAdapter:
     adapter_type = backend_config.get("type")
     
     if adapter_type == "rest_sse":
-        return RestSSEAdapter(
+        adapter_cls = RestSSEAdapter
+        extra = {}
+        if async_io:
+            if AsyncRestSSEAdapter is None:
+                raise ValueError("--async-io requires aiohttp (pip install aiohttp)")
+            adapter_cls = AsyncRestSSEAdapter
+            extra["concurrency"] = pool_size or backend_config.get("pool_size", 10)
+        return adapter_cls(
             base_url=backend_config.get("base_url", "http://localhost:8000"),
             timeout=backend_config.get("timeout", 60),
             poll_interval_ms=backend_config.get("poll_interval_ms", 500),
             max_poll_attempts=backend_config.get("max_poll_attempts", 120),
-            backend_name=backend_name
+            backend_name=backend_name,
+            pool_size=max(pool_size or 0, backend_config.get("pool_size", 10)),
+            use_sse=backend_config.get("use_sse", True),
+            max_retries=backend_config.get("max_retries", 0),
+            **extra
         )
     elif adapter_type == "arrow_flight":
         return ArrowFlightAdapter(
             flight_uri=backend_config.get("flight_uri", "grpc://localhost:8815"),
             health_url=backend_config.get("health_url", "http://localhost:8080/health"),
             timeout=backend_config.get("timeout", 60),
-            backend_name=backend_name
+            backend_name=backend_name,
+            call_headers=backend_config.get("call_headers"),
+            pool_size=min(pool_size or 1, backend_config.get("max_channels", 8))
         )
     else:
         raise ValueError(f"Unknown adapter type: {adapter_type}")
@@ -88,7 +153,7 @@ def print_result(result, console=None):
             table.add_row("Bytes", f"{result.bytes:,}")
             table.add_row("TTFB", f"{result.ttfb*1000:.2f} ms")
             table.add_row("Total Time", f"{result.total_time*1000:.2f} ms")
-            table.add_row("Throughput", f"{result.throughput_bytes_per_sec/1024/1024:.2f} MB/s")
+            table.add_row("Throughput", f"{result.throughput_bytes_per_sec * _INV_MIB:.2f} MB/s")
             
             console.print(table)
         else:
@@ -129,7 +194,7 @@ def print_load_test_results(metrics: LoadTestMetrics, console=None):
         table.add_row("Successful", f"[green]{metrics.successful}[/green]")
         table.add_row("Failed", f"[red]{metrics.failed}[/red]")
         table.add_row("Throughput", f"{metrics.requests_per_second:.2f} req/s")
-        table.add_row("Data Transferred", f"{metrics.total_bytes/1024/1024:.2f} MB")
+        table.add_row("Data Transferred", f"{metrics.total_bytes * _INV_MIB:.2f} MB")
         
         console.print(table)
         
@@ -145,6 +210,8 @@ def print_load_test_results(metrics: LoadTestMetrics, console=None):
         lat_table.add_row("P95", f"{metrics.p95_latency_ms:.2f}")
         lat_table.add_row("P99", f"{metrics.p99_latency_ms:.2f}")
         lat_table.add_row("Avg TTFB", f"{metrics.avg_ttfb_ms:.2f}")
+        lat_table.add_row("P95 TTFB", f"{metrics.p95_ttfb_ms:.2f}")
+        lat_table.add_row("P99 TTFB", f"{metrics.p99_ttfb_ms:.2f}")
         
         console.print(lat_table)
     else:
@@ -162,42 +229,103 @@ def print_load_test_results(metrics: LoadTestMetrics, console=None):
         print(f"  Average:    {metrics.avg_latency_ms:.2f}")
         print(f"  P95:        {metrics.p95_latency_ms:.2f}")
         print(f"  P99:        {metrics.p99_latency_ms:.2f}")
+        print(f"  P95 TTFB:   {metrics.p95_ttfb_ms:.2f}")
         print('='*50)
 
 
+class _BatchedWriter:
+    """
+    Escritor de chunks para consume_stream_query.
+    Guarda referencias a los chunks (sin copiarlos) y los escribe en lote con
+    os.writev cada STREAM_WRITE_BATCH bytes: un syscall por lote en vez de uno
+    por chunk. Sin writev (Windows) los copia a un bytearray y hace un write().
+    """
+    
+    def __init__(self, path: str):
+        self._handle = open(path, 'wb', buffering=0)
+        self._fd = self._handle.fileno()
+        self._pending = []
+        self._pending_bytes = 0
+        self._writev = getattr(os, "writev", None)
+    
+    def write(self, chunk, size: int):
+        self._pending.append(chunk)
+        self._pending_bytes += size
+        if self._pending_bytes >= STREAM_WRITE_BATCH:
+            self.flush()
+    
+    def flush(self):
+        if not self._pending:
+            return
+        if self._writev is not None:
+            views = [memoryview(c) for c in self._pending]
+            while views:
+                written = self._writev(self._fd, views[:_IOV_MAX])
+                # writev puede ser parcial: descartar lo escrito completo y recortar el resto
+                while views and written >= len(views[0]):
+                    written -= len(views[0])
+                    views.pop(0)
+                if written:
+                    views[0] = views[0][written:]
+        else:
+            view = memoryview(b"".join(self._pending))
+            while view:
+                view = view[self._handle.write(view):]
+        self._pending = []
+        self._pending_bytes = 0
+    
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._handle.close()
+
+
+def _capture_return(gen, out: list):
+    """Re-emite los chunks de gen y guarda en out su valor de retorno (el QueryResult)."""
+    out.append((yield from gen))
+
+
 def consume_stream_query(adapter, connector_id, dataset, output_file=None):
     """
-    Helper para consumir stream query y retornar resultado.
-    El Generator de query_stream tiene un bug con return, así que manejamos
-    el resultado de forma diferente.
+    Consume query_stream escribiendo los chunks a output_file (si se indica).
+    status/error/rows vienen del QueryResult que retorna el generator;
+    ttfb/bytes/total_time se miden aquí, incluyendo la escritura a disco.
     """
-    import time
-    from adapters.base import QueryResult, QueryPattern
+    from time import perf_counter
+    from adapters.base import QueryResult, QueryPattern, next_request_id
     
-    t0 = time.perf_counter()
+    t0 = perf_counter()
     ttfb = 0
     total_bytes = 0
-    chunks = 0
+    returned = []
     
-    output_handle = None
-    if output_file:
-        output_handle = open(output_file, 'wb')
+    writer = _BatchedWriter(output_file) if output_file else None
     
     try:
-        gen = adapter.query_stream(
-            connector_id=connector_id,
-            dataset=dataset,
-            output_file=None  # Manejamos output aquí
+        chunks = _capture_return(
+            adapter.query_stream(
+                connector_id=connector_id,
+                dataset=dataset,
+                output_file=None  # Manejamos output aquí
+            ),
+            returned
         )
         
-        for chunk in gen:
-            if chunks == 0:
-                ttfb = time.perf_counter() - t0
-            chunks += 1
-            total_bytes += len(chunk)
-            
-            if output_handle:
-                output_handle.write(chunk)
+        # TTFB sobre el primer chunk, fuera del loop: el loop queda sin ramas
+        first = next(chunks, None)
+        if first is not None:
+            ttfb = perf_counter() - t0
+            if writer is None:
+                total_bytes = len(first)
+                for chunk in chunks:
+                    total_bytes += len(chunk)
+            else:
+                write = writer.write
+                for chunk in itertools.chain((first,), chunks):
+                    size = len(chunk)
+                    total_bytes += size
+                    write(chunk, size)
         
         status = "success"
         error = None
@@ -207,27 +335,43 @@ def consume_stream_query(adapter, connector_id, dataset, output_file=None):
         error = str(e)
     
     finally:
-        if output_handle:
-            output_handle.close()
-    
-    total_time = time.perf_counter() - t0
-    
-    result = QueryResult(
-        request_id=f"{connector_id}:{dataset}:{t0}",
-        backend=adapter.name,
-        connector_id=connector_id,
-        dataset=dataset,
-        pattern=QueryPattern.STREAM.value,
-        status=status,
-        bytes=total_bytes,
-        ttfb=ttfb,
-        total_time=total_time,
-        error=error
-    )
-    result.calculate_metrics()
+        if writer:
+            writer.close()
+    
+    total_time = perf_counter() - t0
+    
+    result = returned[0] if returned and returned[0] is not None else None
+    if result is None or status == "error":
+        # Excepción (del generator o del writer) o generator sin QueryResult de retorno
+        result = QueryResult(
+            request_id=next_request_id(),
+            backend=adapter.name,
+            connector_id=connector_id,
+            dataset=dataset,
+            pattern=QueryPattern.STREAM.value,
+            status=status,
+            error=error
+        )
+    result.bytes = total_bytes
+    result.ttfb = ttfb
+    result.total_time = total_time
     return result
 
 
+def _pattern_type(*allowed: QueryPattern):
+    """type= de argparse: convierte --pattern a QueryPattern una sola vez, al parsear."""
+    def convert(value: str) -> QueryPattern:
+        try:
+            pattern = QueryPattern(value.lower())
+        except ValueError:
+            pattern = None
+        if pattern not in allowed:
+            choices = ", ".join(p.value for p in allowed)
+            raise argparse.ArgumentTypeError(f"invalid choice: '{value}' (choose from {choices})")
+        return pattern
+    return convert
+
+
 # ============== COMMANDS ==============
 
 def cmd_health(args, adapter: IBackendAdapter, console):
@@ -272,9 +416,9 @@ def cmd_list(args, adapter: IBackendAdapter, console):
 
 def cmd_query(args, adapter: IBackendAdapter, metrics: MetricsCollector, console, logger):
     """Ejecuta una query individual."""
-    pattern = QueryPattern[args.pattern.upper()]
+    pattern = args.pattern
     
-    logger.info(f"Query: {args.connector}/{args.dataset} via {pattern.value}")
+    logger.info("Query: %s/%s via %s", args.connector, args.dataset, pattern.value)
     
     if pattern == QueryPattern.SYNC:
         result = adapter.query_sync(
@@ -307,9 +451,20 @@ def cmd_query(args, adapter: IBackendAdapter, metrics: MetricsCollector, console
     print_result(result, console)
 
 
+def _export_json(data: dict, path: str, compact: bool = False):
+    """Escribe data como JSON (orjson si está disponible); compact sin indentación."""
+    if ORJSON_AVAILABLE:
+        option = 0 if compact else orjson.OPT_INDENT_2
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=None if compact else 2)
+
+
 def cmd_load_test(args, adapter: IBackendAdapter, console, logger):
     """Ejecuta load test."""
-    pattern = QueryPattern[args.pattern.upper()]
+    pattern = args.pattern
     
     config = LoadTestConfig(
         total_requests=args.requests,
@@ -318,21 +473,39 @@ def cmd_load_test(args, adapter: IBackendAdapter, console, logger):
         connector_ids=args.connectors.split(",") if args.connectors else None,
         pattern=pattern,
         rows=getattr(args, 'rows', None),
-        output_file=args.output or "metrics.csv"
+        output_file=args.output or "metrics.csv",
+        engine=args.engine,
+        keep_raw=args.keep_raw,
+        flush_every=args.flush_every
     )
     
-    tester = LoadTester(adapter)
-    
-    # Progress callback
-    def progress(completed, total):
-        if RICH_AVAILABLE:
-            print(f"\r  Progress: {completed}/{total}", end="", flush=True)
+    if config.engine == "gevent":
+        from load_tester_gevent import GeventLoadTester
+        tester = GeventLoadTester(adapter)
+    else:
+        tester = LoadTester(adapter)
+    
+    # Progress callback: ~200 actualizaciones por test; sin callback si stdout
+    # no es una terminal o con --quiet
+    progress = None
+    if RICH_AVAILABLE and not args.quiet and sys.stdout.isatty():
+        step = max(1, config.total_requests // 200)
+        last_reported = 0
+        
+        def _report_progress(completed, total):
+            nonlocal last_reported
+            if completed - last_reported >= step or completed == total:
+                last_reported = completed
+                print(f"\r  Progress: {completed}/{total}", end="", flush=True)
+        
+        progress = _report_progress
     
-    logger.info(f"Starting load test: {config.total_requests} requests, {config.concurrency} concurrent")
+    logger.info("Starting load test: %s requests, %s concurrent", config.total_requests, config.concurrency)
     
     metrics = tester.run(config, progress_callback=progress)
     
-    print()  # New line after progress
+    if progress:
+        print()  # New line after progress
     print_load_test_results(metrics, console)
     
     # Exportar JSON si se pide
@@ -354,7 +527,10 @@ def cmd_load_test(args, adapter: IBackendAdapter, console, logger):
                 "p50": metrics.p50_latency_ms,
                 "p95": metrics.p95_latency_ms,
                 "p99": metrics.p99_latency_ms,
-                "avg_ttfb": metrics.avg_ttfb_ms
+                "avg_ttfb": metrics.avg_ttfb_ms,
+                "p50_ttfb": metrics.p50_ttfb_ms,
+                "p95_ttfb": metrics.p95_ttfb_ms,
+                "p99_ttfb": metrics.p99_ttfb_ms
             },
             "data": {
                 "total_bytes": metrics.total_bytes,
@@ -362,9 +538,8 @@ def cmd_load_test(args, adapter: IBackendAdapter, console, logger):
                 "bytes_per_second": metrics.bytes_per_second
             }
         }
-        with open(args.json, 'w') as f:
-            json.dump(data, f, indent=2)
-        logger.info(f"Results exported to {args.json}")
+        _export_json(data, args.json, compact=args.compact)
+        logger.info("Results exported to %s", args.json)
 
 
 def main():
@@ -409,8 +584,8 @@ Examples:
     query_parser.add_argument(
         "--pattern", "-p",
         default="sync",
-        choices=["sync", "stream", "offload"],
-        help="Query pattern (default: sync)"
+        type=_pattern_type(QueryPattern.SYNC, QueryPattern.STREAM, QueryPattern.OFFLOAD),
+        help="Query pattern: sync, stream, offload (default: sync)"
     )
     query_parser.add_argument("--timeout", "-t", type=int, default=60, help="Timeout in seconds")
     query_parser.add_argument("--rows", "-r", type=int, help="Number of rows (optional)")
@@ -425,12 +600,40 @@ Examples:
     load_parser.add_argument(
         "--pattern", "-p",
         default="sync",
-        choices=["sync", "stream"],
-        help="Query pattern (default: sync)"
+        type=_pattern_type(QueryPattern.SYNC, QueryPattern.STREAM),
+        help="Query pattern: sync, stream (default: sync)"
     )
     load_parser.add_argument("--rows", "-r", type=int, help="Rows per request")
     load_parser.add_argument("--output", "-o", default="metrics.csv", help="Output CSV file")
+    load_parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=CSV_FLUSH_EVERY,
+        help=f"Flush the CSV to disk every N results, 0 = only at the end (default: {CSV_FLUSH_EVERY})"
+    )
     load_parser.add_argument("--json", "-j", help="Export results to JSON file")
+    load_parser.add_argument("--compact", action="store_true", help="Write the --json export without indentation")
+    load_parser.add_argument(
+        "--engine",
+        default="thread",
+        choices=["thread", "gevent"],
+        help="Concurrency engine: OS threads or gevent greenlets (default: thread)"
+    )
+    load_parser.add_argument(
+        "--async-io",
+        action="store_true",
+        help="REST/SSE backends: run the load test on asyncio + aiohttp instead of threads"
+    )
+    load_parser.add_argument(
+        "--quiet", "-q",
+        action="store_true",
+        help="Do not print progress while the load test runs"
+    )
+    load_parser.add_argument(
+        "--keep-raw",
+        action="store_true",
+        help="Keep every latency/TTFB sample for exact percentiles (default: HDR histogram if hdrhistogram is installed)"
+    )
     
     args = parser.parse_args()
     
@@ -438,6 +641,16 @@ Examples:
         parser.print_help()
         sys.exit(1)
     
+    # El patch ya se aplicó al importar main.py (ver el bloque inicial); este
+    # import carga GeventLoadTester y valida que gevent esté instalado, antes
+    # de arrancar el QueueListener de setup_logger y de crear el adapter
+    if getattr(args, "engine", None) == "gevent":
+        try:
+            import load_tester_gevent  # noqa: F401
+        except ImportError:
+            print("Error: --engine gevent requires gevent (pip install gevent)")
+            sys.exit(1)
+    
     # Setup
     config = load_config(args.config)
     logging_config = config.get("logging", {})
@@ -457,7 +670,12 @@ Examples:
         ))
     
     try:
-        adapter = create_adapter(args.backend, config)
+        adapter = create_adapter(
+            args.backend,
+            config,
+            pool_size=getattr(args, "concurrency", None),
+            async_io=getattr(args, "async_io", False)
+        )
     except ValueError as e:
         print(f"Error: {e}")
         sys.exit(1)
@@ -482,12 +700,14 @@ Examples:
         print("\nInterrupted")
         sys.exit(1)
     except Exception as e:
-        logger.error(f"Error: {e}")
+        logger.error("Error: %s", e)
         if RICH_AVAILABLE and console:
             console.print(f"[red]Error:[/red] {e}")
         else:
             print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        metrics.close()
 
 
 if __name__ == "__main__":
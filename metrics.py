@@ -2,15 +2,28 @@
 Unified Metrics Collector.
 Collects and exports metrics from all backends in a consistent format.
 """
+import atexit
 import csv
-import os
-import statistics
-from dataclasses import dataclass, field
+from array import array
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from adapters.base import QueryResult
 
+try:
+    from hdrh.histogram import HdrHistogram
+    HDRH_AVAILABLE = True
+except ImportError:
+    HDRH_AVAILABLE = False
+
+# Rango del histograma de latencias: 1 µs a 60 s, 3 cifras significativas
+HDR_MAX_LATENCY_US = 60_000_000
+HDR_SIGNIFICANT_FIGURES = 3
+
 
 @dataclass
 class LoadTestMetrics:
@@ -40,6 +53,137 @@ class LoadTestMetrics:
     
     # TTFB
     avg_ttfb_ms: float = 0
+    p50_ttfb_ms: float = 0
+    p95_ttfb_ms: float = 0
+    p99_ttfb_ms: float = 0
+
+
+class _Percentiles:
+    """
+    Distribución de una métrica (en segundos) para p50/p95/p99 en ms.
+    HdrHistogram en µs si está disponible y no se pide keep_raw; si no,
+    las muestras en ms en un array('d') (percentiles exactos).
+    """
+    __slots__ = ("histogram", "samples_ms")
+    
+    def __init__(self, keep_raw: bool = False):
+        self.histogram = None
+        self.samples_ms: Optional[array] = None
+        if keep_raw or not HDRH_AVAILABLE:
+            self.samples_ms = array('d')
+        else:
+            self.histogram = HdrHistogram(1, HDR_MAX_LATENCY_US, HDR_SIGNIFICANT_FIGURES)
+    
+    def record(self, seconds: float):
+        if self.histogram is not None:
+            self.histogram.record_value(min(int(seconds * 1e6), HDR_MAX_LATENCY_US))
+        else:
+            self.samples_ms.append(seconds * 1000)
+    
+    def quantiles(self) -> Tuple[float, float, float]:
+        """(p50, p95, p99) en ms; ceros si no hay muestras."""
+        if self.histogram is not None:
+            if not self.histogram.get_total_count():
+                return 0, 0, 0
+            return tuple(self.histogram.get_value_at_percentile(p) / 1000 for p in (50, 95, 99))
+        if not self.samples_ms:
+            return 0, 0, 0
+        # Vista zero-copy del array('d') + un único kernel C para los tres cuantiles
+        values = pa.Array.from_buffers(
+            pa.float64(), len(self.samples_ms), [None, pa.py_buffer(self.samples_ms)]
+        )
+        return tuple(pc.quantile(values, q=[0.5, 0.95, 0.99], interpolation="linear").to_pylist())
+
+
+class LoadTestAggregator:
+    """
+    Agregado incremental de un load test: se alimenta resultado a resultado
+    (add) sin retener los QueryResult. Solo guarda contadores, sumas, min/max
+    y las distribuciones de latencia y TTFB de las requests exitosas.
+    
+    Percentiles: con hdrhistogram instalado se usa un HdrHistogram en µs
+    (memoria O(1)); con keep_raw=True, o sin hdrh, se guardan las muestras
+    en un array('d') y los percentiles son exactos (pyarrow.compute.quantile,
+    interpolación lineal).
+    """
+    
+    def __init__(self, keep_raw: bool = False):
+        self.backend: Optional[str] = None
+        self.pattern: Optional[str] = None
+        self.total = 0
+        self.successful = 0
+        self.total_rows = 0
+        self.total_bytes = 0
+        self.latency_sum_ms = 0.0
+        self.latency_min_ms = float("inf")
+        self.latency_max_ms = 0.0
+        self.ttfb_sum_ms = 0.0
+        self.latency = _Percentiles(keep_raw)
+        self.ttfb = _Percentiles(keep_raw)
+    
+    def add(self, result: QueryResult):
+        """Incorpora un resultado al agregado."""
+        if self.backend is None:
+            self.backend = result.backend
+            self.pattern = result.pattern
+        
+        self.total += 1
+        if result.status != "success":
+            return
+        
+        self.successful += 1
+        self.total_rows += result.rows
+        self.total_bytes += result.bytes
+        
+        latency_ms = result.total_time * 1000
+        self.latency_sum_ms += latency_ms
+        if latency_ms < self.latency_min_ms:
+            self.latency_min_ms = latency_ms
+        if latency_ms > self.latency_max_ms:
+            self.latency_max_ms = latency_ms
+        self.latency.record(result.total_time)
+        
+        self.ttfb_sum_ms += result.ttfb * 1000
+        self.ttfb.record(result.ttfb)
+    
+    def to_metrics(self, duration_seconds: float) -> LoadTestMetrics:
+        """Construye LoadTestMetrics a partir del agregado."""
+        if not self.total:
+            return LoadTestMetrics(
+                backend="unknown",
+                pattern="unknown",
+                duration_seconds=duration_seconds,
+                total_requests=0,
+                successful=0,
+                failed=0
+            )
+        
+        n = self.successful
+        p50, p95, p99 = self.latency.quantiles()
+        ttfb_p50, ttfb_p95, ttfb_p99 = self.ttfb.quantiles()
+        
+        return LoadTestMetrics(
+            backend=self.backend,
+            pattern=self.pattern,
+            duration_seconds=duration_seconds,
+            total_requests=self.total,
+            successful=n,
+            failed=self.total - n,
+            total_rows=self.total_rows,
+            total_bytes=self.total_bytes,
+            avg_latency_ms=self.latency_sum_ms / n if n else 0,
+            min_latency_ms=self.latency_min_ms if n else 0,
+            max_latency_ms=self.latency_max_ms,
+            p50_latency_ms=p50,
+            p95_latency_ms=p95,
+            p99_latency_ms=p99,
+            requests_per_second=self.total / duration_seconds if duration_seconds > 0 else 0,
+            bytes_per_second=self.total_bytes / duration_seconds if duration_seconds > 0 else 0,
+            avg_ttfb_ms=self.ttfb_sum_ms / n if n else 0,
+            p50_ttfb_ms=ttfb_p50,
+            p95_ttfb_ms=ttfb_p95,
+            p99_ttfb_ms=ttfb_p99
+        )
 
 
 class MetricsCollector:
@@ -48,88 +192,159 @@ class MetricsCollector:
     Soporta tanto queries individuales como load tests.
     """
     
+    CSV_HEADER = [
+        "timestamp", "backend", "connector_id", "dataset", "pattern",
+        "status", "rows", "bytes", "ttfb_sec", "total_time_sec",
+        "metadata_latency_sec", "transfer_latency_sec",
+        "throughput_bytes_sec", "error"
+    ]
+    
+    # Buffer del handle CSV: un write() por flush en vez de uno por fila
+    CSV_BUFFER_SIZE = 1 << 20
+    
     def __init__(self, output_file: str = "metrics.csv"):
-        self.output_file = output_file
-        self.entries: List[QueryResult] = []
+        self._output_file = output_file
+        self._fh = None
+        self._writer = None
+        self._atexit_registered = False
+        self._reset_summary()
     
-    def add_result(self, result: QueryResult):
-        """Agrega un resultado de query."""
-        self.entries.append(result)
+    @property
+    def output_file(self) -> str:
+        return self._output_file
     
-    def add_results(self, results: List[QueryResult]):
-        """Agrega múltiples resultados."""
-        self.entries.extend(results)
+    @output_file.setter
+    def output_file(self, path: str):
+        if path != self._output_file:
+            self.close()
+            self._output_file = path
     
-    def save_to_csv(self, append: bool = True):
-        """Guarda métricas a CSV."""
-        if not self.entries:
-            return
-        
-        file_exists = os.path.exists(self.output_file)
-        mode = 'a' if append and file_exists else 'w'
+    def _reset_summary(self):
+        """Acumuladores incrementales de get_summary."""
+        self._count = 0
+        self._successful = 0
+        self._ttfb_sum = 0.0
+        self._ttfb_min = float("inf")
+        self._ttfb_max = 0.0
+        self._total_time_sum = 0.0
+        self._throughput_sum = 0.0
+        self._throughput_count = 0
+        self._total_bytes = 0
+        self._total_rows = 0
+    
+    @staticmethod
+    def csv_row(result: QueryResult) -> Tuple:
+        """
+        Fila CSV (orden de CSV_HEADER) ya formateada.
+        El load tester la arma en el thread worker, así el formateo no se
+        serializa en el thread que recolecta resultados.
+        """
+        return (
+            datetime.now().isoformat(),
+            result.backend,
+            result.connector_id,
+            result.dataset,
+            result.pattern,
+            result.status,
+            result.rows,
+            result.bytes,
+            f"{result.ttfb:.6f}",
+            f"{result.total_time:.6f}",
+            f"{result.metadata_latency:.6f}",
+            f"{result.transfer_latency:.6f}",
+            f"{result.throughput_bytes_per_sec:.2f}",
+            result.error or ""
+        )
+    
+    def add_result(self, result: QueryResult, row: Optional[Tuple] = None):
+        """
+        Escribe la fila del resultado en el CSV bufferizado y actualiza el resumen.
+        row: fila ya formateada con csv_row (si no, se formatea aquí).
+        No retiene el QueryResult: memoria O(1) sin importar el largo del test.
+        """
+        self._get_writer().writerow(row if row is not None else self.csv_row(result))
         
-        with open(self.output_file, mode, newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Header si es archivo nuevo
-            if mode == 'w' or not file_exists:
-                writer.writerow([
-                    "timestamp", "backend", "connector_id", "dataset", "pattern",
-                    "status", "rows", "bytes", "ttfb_sec", "total_time_sec",
-                    "metadata_latency_sec", "transfer_latency_sec",
-                    "throughput_bytes_sec", "error"
-                ])
-            
-            for entry in self.entries:
-                writer.writerow([
-                    datetime.now().isoformat(),
-                    entry.backend,
-                    entry.connector_id,
-                    entry.dataset,
-                    entry.pattern,
-                    entry.status,
-                    entry.rows,
-                    entry.bytes,
-                    f"{entry.ttfb:.6f}",
-                    f"{entry.total_time:.6f}",
-                    f"{entry.metadata_latency:.6f}",
-                    f"{entry.transfer_latency:.6f}",
-                    f"{entry.throughput_bytes_per_sec:.2f}",
-                    entry.error or ""
-                ])
+        self._count += 1
+        if result.status != "success":
+            return
         
-        # Limpiar entries después de guardar
-        self.entries = []
+        self._successful += 1
+        ttfb = result.ttfb
+        self._ttfb_sum += ttfb
+        if ttfb < self._ttfb_min:
+            self._ttfb_min = ttfb
+        if ttfb > self._ttfb_max:
+            self._ttfb_max = ttfb
+        self._total_time_sum += result.total_time
+        throughput = result.throughput_bytes_per_sec
+        if throughput > 0:
+            self._throughput_sum += throughput
+            self._throughput_count += 1
+        self._total_bytes += result.bytes
+        self._total_rows += result.rows
+    
+    def add_results(self, results: List[QueryResult]):
+        """Agrega múltiples resultados."""
+        for result in results:
+            self.add_result(result)
+    
+    def _get_writer(self):
+        """Handle CSV persistente, abierto en el primer resultado; header si el archivo está vacío."""
+        if self._fh is None:
+            self._fh = open(
+                self._output_file,
+                'a',
+                newline='',
+                encoding='utf-8',
+                buffering=self.CSV_BUFFER_SIZE
+            )
+            self._writer = csv.writer(self._fh)
+            if self._fh.tell() == 0:
+                self._writer.writerow(self.CSV_HEADER)
+            # Si nadie llama a close(), las filas aún en el buffer se vuelcan al salir
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+        return self._writer
+    
+    def save_to_csv(self):
+        """Vuelca a disco las filas bufferizadas (las filas se escriben en add_result)."""
+        if self._fh is not None:
+            self._fh.flush()
+    
+    def close(self):
+        """Cierra el handle CSV (se reabre con el próximo resultado)."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+            self._writer = None
     
     def get_summary(self) -> Dict[str, Any]:
         """Obtiene resumen de métricas."""
-        if not self.entries:
+        if not self._count:
             return {"count": 0}
         
-        successful = [e for e in self.entries if e.status == "success"]
-        
-        if not successful:
+        n = self._successful
+        if not n:
             return {
-                "count": len(self.entries),
+                "count": self._count,
                 "successful": 0,
-                "failed": len(self.entries)
+                "failed": self._count
             }
         
-        ttfbs = [e.ttfb for e in successful]
-        total_times = [e.total_time for e in successful]
-        throughputs = [e.throughput_bytes_per_sec for e in successful if e.throughput_bytes_per_sec > 0]
-        
         return {
-            "count": len(self.entries),
-            "successful": len(successful),
-            "failed": len(self.entries) - len(successful),
-            "avg_ttfb_seconds": statistics.mean(ttfbs),
-            "min_ttfb_seconds": min(ttfbs),
-            "max_ttfb_seconds": max(ttfbs),
-            "avg_total_time_seconds": statistics.mean(total_times),
-            "avg_throughput_bytes_per_sec": statistics.mean(throughputs) if throughputs else 0,
-            "total_bytes": sum(e.bytes for e in successful),
-            "total_rows": sum(e.rows for e in successful)
+            "count": self._count,
+            "successful": n,
+            "failed": self._count - n,
+            "avg_ttfb_seconds": self._ttfb_sum / n,
+            "min_ttfb_seconds": self._ttfb_min,
+            "max_ttfb_seconds": self._ttfb_max,
+            "avg_total_time_seconds": self._total_time_sum / n,
+            "avg_throughput_bytes_per_sec": (
+                self._throughput_sum / self._throughput_count if self._throughput_count else 0
+            ),
+            "total_bytes": self._total_bytes,
+            "total_rows": self._total_rows
         }
     
     @staticmethod
@@ -137,60 +352,12 @@ class MetricsCollector:
         results: List[QueryResult],
         duration_seconds: float
     ) -> LoadTestMetrics:
-        """Calcula métricas agregadas de un load test."""
-        if not results:
-            return LoadTestMetrics(
-                backend="unknown",
-                pattern="unknown",
-                duration_seconds=duration_seconds,
-                total_requests=0,
-                successful=0,
-                failed=0
-            )
-        
-        backend = results[0].backend
-        pattern = results[0].pattern
-        
-        successful = [r for r in results if r.status == "success"]
-        failed = len(results) - len(successful)
-        
-        # Latencias en ms
-        latencies_ms = [r.total_time * 1000 for r in successful] if successful else [0]
-        ttfbs_ms = [r.ttfb * 1000 for r in successful] if successful else [0]
-        
-        # Percentiles
-        sorted_latencies = sorted(latencies_ms)
-        
-        def percentile(data: List[float], p: float) -> float:
-            if not data:
-                return 0
-            k = (len(data) - 1) * p / 100
-            f = int(k)
-            c = f + 1 if f + 1 < len(data) else f
-            return data[f] + (k - f) * (data[c] - data[f]) if f != c else data[f]
-        
-        metrics = LoadTestMetrics(
-            backend=backend,
-            pattern=pattern,
-            duration_seconds=duration_seconds,
-            total_requests=len(results),
-            successful=len(successful),
-            failed=failed,
-            total_rows=sum(r.rows for r in successful),
-            total_bytes=sum(r.bytes for r in successful),
-            avg_latency_ms=statistics.mean(latencies_ms) if latencies_ms else 0,
-            min_latency_ms=min(latencies_ms) if latencies_ms else 0,
-            max_latency_ms=max(latencies_ms) if latencies_ms else 0,
-            p50_latency_ms=percentile(sorted_latencies, 50),
-            p95_latency_ms=percentile(sorted_latencies, 95),
-            p99_latency_ms=percentile(sorted_latencies, 99),
-            requests_per_second=len(results) / duration_seconds if duration_seconds > 0 else 0,
-            bytes_per_second=sum(r.bytes for r in successful) / duration_seconds if duration_seconds > 0 else 0,
-            avg_ttfb_ms=statistics.mean(ttfbs_ms) if ttfbs_ms else 0
-        )
-        
-        return metrics
+        """Calcula métricas agregadas de un load test (percentiles exactos)."""
+        aggregator = LoadTestAggregator(keep_raw=True)
+        for result in results:
+            aggregator.add(result)
+        return aggregator.to_metrics(duration_seconds)
     
     def clear(self):
-        """Limpia las entradas."""
-        self.entries = []
+        """Reinicia el resumen (las filas ya escritas quedan en el CSV)."""
+        self._reset_summary()